@@ -10,6 +10,19 @@ celery_app = Celery(
 
 celery_app.conf.update(
     task_track_started=True,
+    # Parsing and GPU stages get their own queues and workers so a flood of
+    # chunk tasks cannot starve document parsing.
+    task_default_queue="parse",
+    task_routes={
+        "tasks.process_document.*": {"queue": "parse"},
+        "tasks.process_chunk.*": {"queue": "summarize"},
+        "tasks.embed_chunks.*": {"queue": "embed"},
+        "tasks.finalize_document.*": {"queue": "embed"},
+    },
+    # GPU tasks are long and uneven; a worker only takes a new one when free.
+    worker_prefetch_multiplier=1,
 )
 
 from tasks.process_document import *
+from tasks.embed_chunks import *
+from tasks.finalize_document import *
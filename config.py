@@ -1,4 +1,6 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -18,12 +20,18 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
 
     # AWS / S3
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION: str
     S3_BUCKET_NAME: str
+    IMAGE_UPLOAD_MAX_IN_FLIGHT: int = 8
+    IMAGE_MAX_BYTES_PER_DOCUMENT: int = 100 * 1024 * 1024
+    DOCUMENT_UPLOAD_MAX_IN_FLIGHT: int = 4
+    S3_UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
 
     # Celery
     CELERY_BROKER_URL: str
@@ -36,7 +44,83 @@ class Settings(BaseSettings):
     HF_ACCESS_TOKEN: str
 
     # GPU Service
-    GPU_SERVICE_URL: str
+    # Comma-separated list of GPU service base URLs; GPU_SERVICE_URL is used
+    # when only one backend is deployed.
+    GPU_SERVICE_URL: str = ""
+    GPU_SERVICE_URLS: str = ""
+    GPU_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GPU_SUMMARIZE_TIMEOUT_SECONDS: float = 500.0
+    GPU_EMBED_TIMEOUT_SECONDS: float = 100.0
+    GPU_HEALTH_TIMEOUT_SECONDS: float = 2.0
+    GPU_GENERATE_TIMEOUT_SECONDS: float = 120.0
+    GPU_POOL_SIZE: int = 10
+    GPU_BREAKER_FAILURE_THRESHOLD: int = 5
+    GPU_BREAKER_RESET_SECONDS: float = 30.0
+    GPU_LATENCY_EWMA_ALPHA: float = 0.2
+    GPU_SLOW_EJECTION_FACTOR: float = 3.0
+    GPU_EJECTION_SECONDS: float = 30.0
+
+    # GPU adaptive concurrency
+    GPU_LIMIT_INITIAL: float = 4.0
+    GPU_LIMIT_MIN: float = 1.0
+    GPU_LIMIT_MAX: float = 32.0
+    GPU_LIMIT_DECREASE_FACTOR: float = 0.5
+    GPU_LIMIT_DECREASE_COOLDOWN_SECONDS: float = 5.0
+    GPU_LIMIT_ACQUIRE_TIMEOUT_SECONDS: float = 60.0
+    GPU_LIMIT_POLL_SECONDS: float = 0.25
+    GPU_LIMIT_RETRY_SECONDS: float = 15.0
+    GPU_SUMMARIZE_TARGET_LATENCY_SECONDS: float = 60.0
+    GPU_EMBED_TARGET_LATENCY_SECONDS: float = 10.0
+
+    # Retrieval
+    SEARCH_DEFAULT_TOP_K: int = 5
+    SEARCH_MAX_TOP_K: int = 50
+    SEARCH_DEFAULT_EF_SEARCH: int = 40
+    SEARCH_TEXT_SEARCH_CONFIG: str = "english"
+    SEARCH_RRF_K: int = 60
+    SEARCH_HYBRID_CANDIDATE_MULTIPLIER: int = 4
+
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+
+    # Progress events
+    PROGRESS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Chat
+    CHAT_CONTEXT_CHUNKS: int = 5
+    CHAT_HISTORY_MESSAGES: int = 10
+
+    # Health checks
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 15.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 5.0
+
+    # Embedding
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100_000
+    EMBED_BATCH_SIZE: int = 32
+    EMBED_BATCH_MAX_WAIT_SECONDS: float = 2.0
+
+    # Image normalization
+    IMAGE_NORMALIZE_ENABLED: bool = True
+    IMAGE_MAX_DIMENSION: int = 1568
+    IMAGE_OUTPUT_FORMAT: Literal["webp", "jpeg"] = "webp"
+    IMAGE_OUTPUT_QUALITY: int = 85
+    IMAGE_NORMALIZE_MAX_WORKERS: int = 4
+
+    # Document finalization
+    FINALIZE_RETRY_SECONDS: float = 5.0
+    FINALIZE_MAX_RETRIES: int = 360
+
+    @model_validator(mode="after")
+    def require_gpu_service(self):
+        # Without an endpoint every GPU call would fail at runtime, so the
+        # worker and API refuse to start instead.
+        if not self.GPU_SERVICE_URL.strip() and not any(
+            url.strip() for url in self.GPU_SERVICE_URLS.split(",")
+        ):
+            raise ValueError("Set GPU_SERVICE_URL or GPU_SERVICE_URLS")
+        return self
 
 
 settings = Settings()  # type: ignore
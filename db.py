@@ -1,5 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from pgvector.asyncpg import register_vector
 from config import settings
 
 DATABASE_URL = (
@@ -10,10 +12,26 @@ DATABASE_URL = (
     f"{settings.DB_NAME}"
 )
 
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# The sync engine serves the Celery workers and table creation; the API routes
+# go through the asyncpg engine so queries never block the event loop.
 engine = create_engine(DATABASE_URL, echo=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def register_vector_type(dbapi_connection, connection_record):
+    dbapi_connection.run_async(register_vector)
+
+
 Base = declarative_base()
 
 
@@ -22,9 +40,6 @@ def init_db():
     print("Tables created")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,59 @@
+-- Brings a database created before the ingestion pipeline rework up to date
+-- with models.py. init_db() only creates missing tables, so existing ones
+-- need this once:
+--
+--   psql "postgresql://$DB_USER:$DB_PASSWORD@$DB_HOST:$DB_PORT/$DB_NAME" \
+--     -f migrations/001_ingestion_pipeline.sql
+--
+-- Every statement is idempotent, so the script can be re-run safely.
+
+BEGIN;
+
+-- Project readiness counters
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS documents_total integer DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS documents_ready integer DEFAULT 0;
+
+UPDATE projects p
+SET documents_total = counts.total,
+    documents_ready = counts.ready
+FROM (
+    SELECT p2.id,
+           count(d.id) AS total,
+           count(d.id) FILTER (WHERE d.status = 'ready') AS ready
+    FROM projects p2
+    LEFT JOIN documents d ON d.project_id = p2.id
+    GROUP BY p2.id
+) counts
+WHERE counts.id = p.id;
+
+-- Content-addressed uploads. Existing documents keep a NULL hash and are
+-- simply never used as a source for deduplication.
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash varchar;
+CREATE INDEX IF NOT EXISTS ix_documents_content_hash ON documents (content_hash);
+
+-- Vector retrieval
+CREATE INDEX IF NOT EXISTS ix_chunks_embedding_hnsw ON chunks
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- Hybrid retrieval. The text search configuration must match
+-- SEARCH_TEXT_SEARCH_CONFIG.
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+CREATE INDEX IF NOT EXISTS ix_chunks_content_tsv ON chunks USING gin (content_tsv);
+
+-- Keyset pagination; the chunks index also serves document_id lookups
+CREATE INDEX IF NOT EXISTS ix_projects_user_id_created_at_id
+    ON projects (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_documents_project_id_created_at_id
+    ON documents (project_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_chunks_document_id_created_at_id
+    ON chunks (document_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_messages_project_id_created_at_id
+    ON messages (project_id, created_at, id);
+
+-- Image normalization sizes. Images stored before normalization existed
+-- keep NULL sizes.
+ALTER TABLE images ADD COLUMN IF NOT EXISTS original_size integer;
+ALTER TABLE images ADD COLUMN IF NOT EXISTS stored_size integer;
+
+COMMIT;
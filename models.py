@@ -1,10 +1,20 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, mapped_column
+from sqlalchemy import (
+    Column,
+    String,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Boolean,
+    Index,
+    Computed,
+)
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, mapped_column, deferred
 from datetime import datetime
 import uuid
 from db import Base
 from pgvector.sqlalchemy import VECTOR
+from config import settings
 
 
 class User(Base):
@@ -22,11 +32,17 @@ class User(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     status = Column(String, default="created")
 
+    documents_total = Column(Integer, default=0)
+    documents_ready = Column(Integer, default=0)
+
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -41,6 +57,11 @@ class Project(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index(
+            "ix_documents_project_id_created_at_id", "project_id", "created_at", "id"
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     filename = Column(String, nullable=False)
@@ -48,6 +69,7 @@ class Document(Base):
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
     s3_key = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True, index=True)
     status = Column(String, nullable=False, default="uploaded")
 
     total_chunks = Column(Integer, nullable=True)
@@ -62,9 +84,30 @@ class Document(Base):
 
 class Chunk(Base):
     __tablename__ = "chunks"
+    __table_args__ = (
+        Index(
+            "ix_chunks_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        Index("ix_chunks_content_tsv", "content_tsv", postgresql_using="gin"),
+        Index("ix_chunks_document_id_created_at_id", "document_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     content = Column(String, nullable=False)
+    # Only read by full-text search, so loading a Chunk never fetches it.
+    content_tsv = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"to_tsvector('{settings.SEARCH_TEXT_SEARCH_CONFIG}', content)",
+                persisted=True,
+            ),
+        )
+    )
     status = Column(String, nullable=False, default="created")
     summarised_content = Column(String, nullable=True)
     embedding = mapped_column(VECTOR(384))
@@ -85,6 +128,8 @@ class Image(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     s3_key = Column(String, nullable=True)
+    original_size = Column(Integer, nullable=True)
+    stored_size = Column(Integer, nullable=True)
 
     chunk_id = Column(UUID(as_uuid=True), ForeignKey("chunks.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -94,6 +139,9 @@ class Image(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     role = Column(String, nullable=False)
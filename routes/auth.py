@@ -4,14 +4,15 @@ from fastapi import Depends, APIRouter, HTTPException, status
 from schemas import JWTToken
 from db import get_db
 from models import User
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from security.jwt import create_access_token
 
 route = APIRouter(prefix="/api/login", tags=["login"])
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.email == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(User).where(User.email == username))
 
     if not user:
         return None
@@ -24,13 +25,13 @@ def authenticate_user(db: Session, username: str, password: str):
 
 @route.post("/", response_model=JWTToken)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
     username = form_data.username
     password = form_data.password
 
     print("HERE")
-    user = authenticate_user(db, username, password)
+    user = await authenticate_user(db, username, password)
 
     if not user:
         raise HTTPException(
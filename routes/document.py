@@ -1,25 +1,47 @@
-from fastapi import Depends, APIRouter, HTTPException, status, File, UploadFile
-from schemas import DocumentResponse
+from fastapi import (
+    Depends,
+    APIRouter,
+    HTTPException,
+    status,
+    File,
+    UploadFile,
+    Query,
+    Response,
+)
+from schemas import DocumentResponse, DocumentSummaryResponse
 from db import get_db
-from models import User, Project, Document
-from sqlalchemy.orm import Session
+from models import User, Project, Document, Chunk
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from security.jwt import get_current_active_user
 from utils.s3 import upload_files_to_s3, delete_file_from_s3
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
 
 route = APIRouter(prefix="/api/projects/{project_id}/documents", tags=["documents"])
 
 
-@route.get("/", response_model=list[DocumentResponse])
+@route.get("/", response_model=list[DocumentSummaryResponse])
 async def list_documents(
     project_id: UUID,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
     )
 
     if not project:
@@ -27,12 +49,17 @@ async def list_documents(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    return (
-        db.query(Document)
-        .filter(Document.project_id == project_id)
-        .order_by(Document.created_at.asc())
-        .all()
+    projection = parse_fields(fields, Document, DocumentSummaryResponse)
+
+    documents, next_cursor = await fetch_page(
+        db,
+        Document,
+        [Document.project_id == project_id],
+        cursor=cursor,
+        limit=limit,
+        fields=projection,
     )
+    return page_response(response, documents, next_cursor, projection is not None)
 
 
 @route.get("/{document_id}", response_model=DocumentResponse)
@@ -40,12 +67,12 @@ async def get_document(
     project_id: UUID,
     document_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
     )
 
     if not project:
@@ -53,10 +80,10 @@ async def get_document(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    document = (
-        db.query(Document)
-        .filter(Document.project_id == project_id, Document.id == document_id)
-        .first()
+    document = await db.scalar(
+        select(Document)
+        .where(Document.project_id == project_id, Document.id == document_id)
+        .options(selectinload(Document.chunks).selectinload(Chunk.images))
     )
 
     if not document:
@@ -66,17 +93,17 @@ async def get_document(
     return document
 
 
-@route.post("/", response_model=list[DocumentResponse])
+@route.post("/", response_model=list[DocumentSummaryResponse])
 async def create_documents(
     project_id: UUID,
     documents: list[UploadFile] = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project)
+        .where(Project.user_id == current_user.id, Project.id == project_id)
+        .options(selectinload(Project.messages))
     )
 
     if not project:
@@ -84,7 +111,7 @@ async def create_documents(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    upload_result = await upload_files_to_s3(current_user.id, project.id, documents)  # type: ignore
+    upload_result = await upload_files_to_s3(documents)
 
     project.status = "uploaded"  # type: ignore
     project.messages = []
@@ -93,6 +120,7 @@ async def create_documents(
         Document(
             filename=doc["filename"],
             s3_key=doc.get("s3_key"),
+            content_hash=doc.get("content_hash"),
             status=doc["status"],
             project_id=project_id,
         )
@@ -100,12 +128,9 @@ async def create_documents(
     ]
 
     db.add_all(db_documents)
-    db.commit()
+    project.documents_total = Project.documents_total + len(db_documents)  # type: ignore
+    await db.commit()
 
-    for doc in db_documents:
-        db.refresh(doc)
-
-    db.refresh(project)
     return db_documents
 
 
@@ -114,12 +139,12 @@ async def delete_document(
     project_id: UUID,
     document_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
     )
 
     if not project:
@@ -127,10 +152,10 @@ async def delete_document(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    document = (
-        db.query(Document)
-        .filter(Document.project_id == project_id, Document.id == document_id)
-        .first()
+    document = await db.scalar(
+        select(Document).where(
+            Document.project_id == project_id, Document.id == document_id
+        )
     )
 
     if not document:
@@ -138,21 +163,29 @@ async def delete_document(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
-    if document.s3_key:  # type: ignore
+    # Uploads are content-addressed, so the object may back other documents.
+    shared_object = await db.scalar(
+        select(Document.id).where(
+            Document.s3_key == document.s3_key, Document.id != document.id
+        )
+    )
+
+    if document.s3_key and not shared_object:  # type: ignore
         try:
             await delete_file_from_s3(document.s3_key)  # type: ignore
         except Exception as e:
             print(f"Warning: Failed to delete file from S3: {str(e)}")
 
-    db.delete(document)
-    db.flush()
+    project.documents_total = Project.documents_total - 1  # type: ignore
+    if document.status == "ready":  # type: ignore
+        project.documents_ready = Project.documents_ready - 1  # type: ignore
 
-    remaining_docs = (
-        db.query(Document).filter(Document.project_id == project_id).count()
-    )
+    await db.delete(document)
+    await db.flush()
+    await db.refresh(project)
 
-    if remaining_docs == 0:
+    if project.documents_total == 0:  # type: ignore
         project.status = "created"  # type: ignore
 
-    db.commit()
+    await db.commit()
     return
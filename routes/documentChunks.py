@@ -1,32 +1,44 @@
-from fastapi import Depends, APIRouter, HTTPException, status
-from schemas import ChunkCreateRequest, ChunkResponse
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Response
+from schemas import ChunkCreateRequest, ChunkResponse, ChunkSummaryResponse
 from db import get_db
 from models import User, Document, Chunk
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from security.jwt import get_current_active_user
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
 
 route = APIRouter(
     prefix="/api/projects/{project_id}/documents/{document_id}/chunks", tags=["chunks"]
 )
 
 
-@route.get("/", response_model=list[ChunkResponse])
+@route.get("/", response_model=list[ChunkSummaryResponse])
 async def list_chunks(
     project_id: UUID,
     document_id: UUID,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    document = (
-        db.query(Document)
+    document = await db.scalar(
+        select(Document)
         .join(Document.project)
-        .filter(
+        .where(
             Document.id == document_id,
             Document.project_id == project_id,
             Document.project.has(user_id=current_user.id),
         )
-        .first()
     )
 
     if not document:
@@ -34,14 +46,18 @@ async def list_chunks(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
-    chunks = (
-        db.query(Chunk)
-        .filter(Chunk.document_id == document_id)
-        .order_by(Chunk.created_at.asc())
-        .all()
+    projection = parse_fields(fields, Chunk, ChunkSummaryResponse)
+
+    chunks, next_cursor = await fetch_page(
+        db,
+        Chunk,
+        [Chunk.document_id == document_id],
+        cursor=cursor,
+        limit=limit,
+        fields=projection,
     )
 
-    return chunks
+    return page_response(response, chunks, next_cursor, projection is not None)
 
 
 @route.get("/{chunk_id}", response_model=ChunkResponse)
@@ -50,17 +66,16 @@ async def get_chunk(
     document_id: UUID,
     chunk_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    document = (
-        db.query(Document)
+    document = await db.scalar(
+        select(Document)
         .join(Document.project)
-        .filter(
+        .where(
             Document.id == document_id,
             Document.project_id == project_id,
             Document.project.has(user_id=current_user.id),
         )
-        .first()
     )
 
     if not document:
@@ -68,10 +83,10 @@ async def get_chunk(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
-    chunk = (
-        db.query(Chunk)
-        .filter(Chunk.document_id == document_id, Chunk.id == chunk_id)
-        .first()
+    chunk = await db.scalar(
+        select(Chunk)
+        .where(Chunk.document_id == document_id, Chunk.id == chunk_id)
+        .options(selectinload(Chunk.images))
     )
 
     if not chunk:
@@ -1,10 +1,26 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from schemas import MessageCreateRequest, MessageResponse
-from db import get_db
+from db import get_db, AsyncSessionLocal
 from models import User, Project, Message
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from config import settings
 from security.jwt import get_current_active_user
+from utils import gpu
+from utils.chat import build_chat_messages
+from utils.events import format_sse
+from utils.retrieval import search_project_chunks
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
+import requests
 
 route = APIRouter(prefix="/api/projects/{project_id}/messages", tags=["messages"])
 
@@ -12,13 +28,17 @@ route = APIRouter(prefix="/api/projects/{project_id}/messages", tags=["messages"
 @route.get("/", response_model=list[MessageResponse])
 async def list_messages(
     project_id: UUID,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
     )
 
     if not project:
@@ -26,25 +46,30 @@ async def list_messages(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    return (
-        db.query(Message)
-        .filter(Message.project_id == project_id)
-        .order_by(Message.created_at.asc())
-        .all()
+    projection = parse_fields(fields, Message, MessageResponse)
+
+    messages, next_cursor = await fetch_page(
+        db,
+        Message,
+        [Message.project_id == project_id],
+        cursor=cursor,
+        limit=limit,
+        fields=projection,
     )
+    return page_response(response, messages, next_cursor, projection is not None)
 
 
-@route.post("/", response_model=list[MessageResponse])
+@route.post("/")
 async def create_message(
     project_id: UUID,
     message: MessageCreateRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
     )
 
     if not project:
@@ -52,6 +77,29 @@ async def create_message(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
+    history = (
+        await db.scalars(
+            select(Message)
+            .where(Message.project_id == project_id)
+            .order_by(Message.created_at.desc())
+            .limit(settings.CHAT_HISTORY_MESSAGES)
+        )
+    ).all()
+
+    try:
+        context_chunks, _ = await search_project_chunks(
+            project_id=project_id,
+            query_text=message.content,
+            top_k=settings.CHAT_CONTEXT_CHUNKS,
+            ef_search=settings.SEARCH_DEFAULT_EF_SEARCH,
+            mode="hybrid",
+        )
+    except (gpu.GPUServiceUnavailable, requests.exceptions.RequestException) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding service unavailable: {str(e)}",
+        )
+
     user_message = Message(
         role=message.role,
         content=message.content,
@@ -59,17 +107,76 @@ async def create_message(
     )
 
     db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
+    await db.commit()
+    await db.refresh(user_message)
 
-    assistant_message = Message(
-        role="assistant",
-        content="This is a placeholder LLM response.",
-        project_id=project_id,
+    # The request session would otherwise stay checked out until the stream
+    # ends; everything the reply needs is already loaded.
+    await db.close()
+
+    chat_messages = build_chat_messages(
+        list(reversed(history)), context_chunks, message.content
     )
 
-    db.add(assistant_message)
-    db.commit()
-    db.refresh(assistant_message)
+    return StreamingResponse(
+        stream_assistant_reply(project_id, user_message, chat_messages, context_chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    return [user_message, assistant_message]
+
+async def stream_assistant_reply(
+    project_id: UUID, user_message: Message, chat_messages, context_chunks
+):
+    # Tokens are relayed as they arrive; the assistant message is stored once
+    # the stream completes, on its own session since the request's is closed.
+    yield format_sse(
+        "message", MessageResponse.model_validate(user_message).model_dump(mode="json")
+    )
+    yield format_sse(
+        "sources",
+        [
+            {
+                "chunk_id": chunk["chunk_id"],
+                "document_id": chunk["document_id"],
+                "page_number": chunk["page_number"],
+                "score": chunk["score"],
+            }
+            for chunk in context_chunks
+        ],
+    )
+
+    tokens = []
+    try:
+        response = await run_in_threadpool(gpu.open_generate_stream, chat_messages)
+    except Exception as e:
+        yield format_sse("error", {"detail": f"Generation failed: {str(e)}"})
+        return
+
+    try:
+        async for token in iterate_in_threadpool(gpu.iter_tokens(response)):
+            tokens.append(token)
+            yield format_sse("token", {"token": token})
+    except Exception as e:
+        yield format_sse("error", {"detail": f"Generation failed: {str(e)}"})
+        return
+    finally:
+        # Runs on the event loop even when a client disconnect cancels this
+        # generator, and unblocks the thread waiting on the next token.
+        gpu.abort_stream(response)
+
+    async with AsyncSessionLocal() as db:
+        assistant_message = Message(
+            role="assistant",
+            content="".join(tokens),
+            project_id=project_id,
+        )
+
+        db.add(assistant_message)
+        await db.commit()
+        await db.refresh(assistant_message)
+
+    yield format_sse(
+        "done",
+        MessageResponse.model_validate(assistant_message).model_dump(mode="json"),
+    )
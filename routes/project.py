@@ -1,42 +1,75 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import (
+    Depends,
+    APIRouter,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from schemas import (
     ProjectCreateRequest,
     ProjectResponse,
+    ProjectSummaryResponse,
     ProjectUpdateRequest,
     ProjectProgressResponse,
+    DocumentProgressResponse,
 )
-from db import get_db
+from db import get_db, AsyncSessionLocal
 from models import Project, User, Document
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from security.jwt import get_current_active_user
 from tasks.process_document import process_document
+from utils.events import relay_progress
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
+import hashlib
 
 route = APIRouter(prefix="/api/projects", tags=["projects"])
 
 
-@route.get("/", response_model=list[ProjectResponse])
+@route.get("/", response_model=list[ProjectSummaryResponse])
 async def list_projects(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id)
-        .order_by(Project.created_at.asc())
-        .all()
+    projection = parse_fields(fields, Project, ProjectSummaryResponse)
+
+    projects, next_cursor = await fetch_page(
+        db,
+        Project,
+        [Project.user_id == current_user.id],
+        cursor=cursor,
+        limit=limit,
+        fields=projection,
     )
+    return page_response(response, projects, next_cursor, projection is not None)
 
 
 @route.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
+    project = await db.scalar(
+        select(Project)
+        .where(Project.id == project_id, Project.user_id == current_user.id)
+        .options(selectinload(Project.messages))
     )
 
     if not project:
@@ -50,55 +83,113 @@ async def get_project(
 @route.get("/{project_id}/progress", response_model=ProjectProgressResponse)
 async def get_project_progress(
     project_id: UUID,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(
-            Project.id == project_id,
+    # One round trip: the project's maintained counters plus only the progress
+    # columns of its documents, outer-joined so an empty project still returns.
+    rows = (
+        await db.execute(
+            select(
+                Project.status.label("project_status"),
+                Project.documents_total,
+                Project.documents_ready,
+                Document.id,
+                Document.project_id,
+                Document.filename,
+                Document.status,
+                Document.total_chunks,
+                Document.chunks_summarized,
+                Document.chunks_embedded,
+            )
+            .select_from(Project)
+            .outerjoin(Document, Document.project_id == Project.id)
+            .where(Project.id == project_id, Project.user_id == current_user.id)
+            .order_by(Document.created_at.asc())
+        )
+    ).all()
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-        .first()
+
+    progress = ProjectProgressResponse(
+        status=rows[0].project_status,
+        total_documents=rows[0].documents_total or 0,
+        documents_processed=rows[0].documents_ready or 0,
+        documents=[
+            DocumentProgressResponse(
+                id=row.id,
+                project_id=row.project_id,
+                filename=row.filename,
+                status=row.status,
+                total_chunks=row.total_chunks,
+                chunks_summarized=row.chunks_summarized or 0,
+                chunks_embedded=row.chunks_embedded or 0,
+            )
+            for row in rows
+            if row.id is not None
+        ],
     )
 
+    body = progress.model_dump_json()
+    etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@route.get("/{project_id}/progress/stream")
+async def stream_project_progress(
+    project_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+):
+    # The ownership check uses its own short-lived session. A request-scoped
+    # one would stay checked out until the stream ends.
+    async with AsyncSessionLocal() as db:
+        project = await db.scalar(
+            select(Project.id).where(
+                Project.id == project_id, Project.user_id == current_user.id
+            )
+        )
+
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    documents = (
-        db.query(Document)
-        .filter(Document.project_id == project_id)
-        .order_by(Document.created_at.asc())
-        .all()
+    # Workers publish progress to Redis as it happens; this relays it without
+    # touching the database again for the lifetime of the stream.
+    return StreamingResponse(
+        relay_progress(project_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    documents_processed = sum(
-        1
-        for d in documents
-        if d.total_chunks and d.chunks_embedded == d.total_chunks  # type: ignore
-    )
 
-    return ProjectProgressResponse(
-        status=project.status,  # type: ignore
-        total_documents=len(documents),
-        documents_processed=documents_processed,
-        documents=documents,  # type: ignore
-    )
+def dispatch_documents(project_id: str, document_ids: list[str]):
+    for document_id in document_ids:
+        process_document.delay(project_id, document_id)
 
 
 @route.post("/{project_id}/process", response_model=ProjectResponse)
-def start_processing(
+async def start_processing(
     project_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(
+    project = await db.scalar(
+        select(Project)
+        .where(
             Project.id == project_id,
         )
-        .first()
+        .options(selectinload(Project.messages))
     )
 
     if not project:
@@ -106,14 +197,17 @@ def start_processing(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    documents = db.query(Document).filter(Document.project_id == project_id).all()
+    documents = (
+        await db.scalars(select(Document).where(Document.project_id == project_id))
+    ).all()
 
-    for doc in documents:
-        process_document.delay(str(project.id), str(doc.id))  # type: ignore
+    # Publishing to the broker is blocking I/O, so it stays off the event loop.
+    await run_in_threadpool(
+        dispatch_documents, str(project.id), [str(doc.id) for doc in documents]
+    )
 
     project.status = "processing"  # type: ignore
-    db.commit()
-    db.refresh(project)
+    await db.commit()
 
     return project
 
@@ -122,12 +216,12 @@ def start_processing(
 async def create_project(
     project: ProjectCreateRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     db_project = Project(name=project.name, user_id=current_user.id)
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project, attribute_names=["messages"])
     return db_project
 
 
@@ -136,12 +230,12 @@ async def update_project(
     project_id: UUID,
     project_update: ProjectUpdateRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project)
+        .where(Project.user_id == current_user.id, Project.id == project_id)
+        .options(selectinload(Project.messages))
     )
 
     if not project:
@@ -152,8 +246,7 @@ async def update_project(
     if project_update.name is not None:
         project.name = project_update.name  # type: ignore
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
     return project
 
 
@@ -161,12 +254,12 @@ async def update_project(
 async def delete_project(
     project_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id, Project.id == project_id)
-        .first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
     )
 
     if not project:
@@ -176,6 +269,6 @@ async def delete_project(
 
     # delete from s3 here.
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     return
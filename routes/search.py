@@ -0,0 +1,52 @@
+from fastapi import Depends, APIRouter, HTTPException, status
+from schemas import SearchRequest, SearchResponse
+from db import get_db
+from models import User, Project
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from config import settings
+from security.jwt import get_current_active_user
+from utils import gpu
+from utils.retrieval import search_project_chunks
+import requests
+
+route = APIRouter(prefix="/api/projects/{project_id}/search", tags=["search"])
+
+
+@route.post("/", response_model=SearchResponse)
+async def search_chunks(
+    project_id: UUID,
+    search: SearchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    project = await db.scalar(
+        select(Project).where(
+            Project.user_id == current_user.id, Project.id == project_id
+        )
+    )
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    ef_search = max(search.ef_search or settings.SEARCH_DEFAULT_EF_SEARCH, search.top_k)
+
+    try:
+        results, timings = await search_project_chunks(
+            project_id=project_id,
+            query_text=search.query,
+            top_k=search.top_k,
+            ef_search=ef_search,
+            document_ids=search.document_ids,
+            mode=search.mode,
+        )
+    except (gpu.GPUServiceUnavailable, requests.exceptions.RequestException) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding service unavailable: {str(e)}",
+        )
+
+    return {"results": results, "timings": timings}
@@ -2,8 +2,9 @@ from fastapi import Depends, APIRouter, HTTPException, status
 from schemas import UserCreateRequest, UserResponse
 from db import get_db
 from models import User
-from sqlalchemy.orm import Session
-from security.jwt import get_current_active_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from security.jwt import get_current_active_user, invalidate_cached_user
 from security.password import password_hash
 
 route = APIRouter(prefix="/api/users", tags=["users"])
@@ -15,8 +16,8 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
 
 
 @route.post("/", response_model=UserResponse)
-async def create_user(user: UserCreateRequest, db: Session = Depends(get_db)):
-    existingUser = db.query(User).filter(User.username == user.username).first()
+async def create_user(user: UserCreateRequest, db: AsyncSession = Depends(get_db)):
+    existingUser = await db.scalar(select(User).where(User.username == user.username))
 
     if existingUser:
         raise HTTPException(
@@ -24,7 +25,7 @@ async def create_user(user: UserCreateRequest, db: Session = Depends(get_db)):
             detail={"username": "Username already exists"},
         )
 
-    existingEmail = db.query(User).filter(User.email == user.email).first()
+    existingEmail = await db.scalar(select(User).where(User.email == user.email))
 
     if existingEmail:
         raise HTTPException(
@@ -41,6 +42,8 @@ async def create_user(user: UserCreateRequest, db: Session = Depends(get_db)):
         email=user.email,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+
+    invalidate_cached_user(db_user.email)  # type: ignore
     return db_user
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
+from config import settings
 from uuid import UUID
 from datetime import datetime
-from typing import List
+from typing import List, Literal
 
 
 class UserCreateRequest(BaseModel):
@@ -33,6 +34,16 @@ class ProjectUpdateRequest(BaseModel):
     name: str | None = None
 
 
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1)
+    top_k: int = Field(
+        default=settings.SEARCH_DEFAULT_TOP_K, ge=1, le=settings.SEARCH_MAX_TOP_K
+    )
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
+    document_ids: List[UUID] | None = None
+    mode: Literal["vector", "hybrid"] = "vector"
+
+
 class UserResponse(BaseModel):
     id: UUID
     name: str
@@ -44,31 +55,37 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
-class ProjectResponse(BaseModel):
+class ProjectSummaryResponse(BaseModel):
     id: UUID
     user_id: UUID
     name: str
     status: str
     created_at: datetime
-    messages: List["MessageResponse"] = []
 
     class Config:
         from_attributes = True
 
 
-class DocumentResponse(BaseModel):
+class ProjectResponse(ProjectSummaryResponse):
+    messages: List["MessageResponse"] = []
+
+
+class DocumentSummaryResponse(BaseModel):
     id: UUID
     project_id: UUID
     filename: str
     created_at: datetime
     status: str
     s3_key: str | None = None
-    chunks: List["ChunkResponse"] = []
 
     class Config:
         from_attributes = True
 
 
+class DocumentResponse(DocumentSummaryResponse):
+    chunks: List["ChunkResponse"] = []
+
+
 class DocumentProgressResponse(BaseModel):
     id: UUID
     project_id: UUID
@@ -89,7 +106,7 @@ class ProjectProgressResponse(BaseModel):
     documents: List[DocumentProgressResponse]
 
 
-class ChunkResponse(BaseModel):
+class ChunkSummaryResponse(BaseModel):
     id: UUID
     document_id: UUID
     content: str
@@ -98,18 +115,26 @@ class ChunkResponse(BaseModel):
     has_image: bool | None = None
     has_table: bool | None = None
     created_at: datetime
-    images: List["ImageResponse"] = []
 
     class Config:
         from_attributes = True
 
 
+class ChunkResponse(ChunkSummaryResponse):
+    images: List["ImageResponse"] = []
+
+
 class ImageResponse(BaseModel):
     id: UUID
     chunk_id: UUID
     s3_key: str | None = None
+    original_size: int | None = None
+    stored_size: int | None = None
     created_at: datetime
 
+    class Config:
+        from_attributes = True
+
 
 class MessageResponse(BaseModel):
     id: UUID
@@ -120,3 +145,24 @@ class MessageResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SearchResultResponse(BaseModel):
+    chunk_id: UUID
+    document_id: UUID
+    page_number: int
+    content: str
+    summarised_content: str | None = None
+    score: float
+
+
+class SearchTimingsResponse(BaseModel):
+    embed_ms: float
+    search_ms: float
+    lexical_ms: float | None = None
+    total_ms: float
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResultResponse]
+    timings: SearchTimingsResponse
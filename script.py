@@ -7,8 +7,10 @@ from routes.document import route as document_route
 from routes.documentChunks import route as chunk_route
 from routes.auth import route as login_route
 from routes.messages import route as messages_route
+from routes.search import route as search_route
 from fastapi.middleware.cors import CORSMiddleware
-import requests
+from utils.health import run_health_prober
+import asyncio
 
 import logging
 
@@ -29,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
@@ -37,6 +40,16 @@ def on_startup():
     init_db()
 
 
+@app.on_event("startup")
+async def start_health_prober():
+    app.state.health_prober = asyncio.create_task(run_health_prober())
+
+
+@app.on_event("shutdown")
+async def stop_health_prober():
+    app.state.health_prober.cancel()
+
+
 app.include_router(health_route)
 app.include_router(login_route)
 app.include_router(user_route)
@@ -44,3 +57,4 @@ app.include_router(project_route)
 app.include_router(document_route)
 app.include_router(chunk_route)
 app.include_router(messages_route)
+app.include_router(search_route)
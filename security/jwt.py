@@ -2,14 +2,25 @@ from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta, timezone
 import jwt
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
-from db import get_db
+from db import AsyncSessionLocal
 from models import User
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from fastapi import Depends, HTTPException, status
 from config import settings
+from utils.ttl_cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
+# Resolved users keyed by token subject, so authenticated requests skip the
+# users lookup. Entries are dropped on user changes and expire after the TTL.
+user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_cached_user(email: str):
+    user_cache.invalidate(email)
+
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -23,9 +34,7 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -47,9 +56,17 @@ async def get_current_user(
     except InvalidTokenError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == username).first()
+    user = user_cache.get(username)
+    if user is not None:
+        return user
+
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == username))
+
     if user is None:
         raise credentials_exception
+
+    user_cache.set(username, user)
     return user
 
 
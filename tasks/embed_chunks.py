@@ -0,0 +1,178 @@
+from celery_app import celery_app
+from db import SessionLocal
+from models import Document, Chunk
+from uuid import UUID
+from collections import Counter
+from config import settings
+from utils import gpu
+from utils.redis_client import redis_client
+from utils.embedding_cache import get_cached_embeddings, store_embeddings
+from tasks.progress import increment_chunks_embedded
+from utils.events import publish_progress
+from tasks.retry import failures_exhausted, is_backpressure, retry_task
+
+EMBED_BATCH_SIZE = settings.EMBED_BATCH_SIZE
+EMBED_BATCH_MAX_WAIT_SECONDS = settings.EMBED_BATCH_MAX_WAIT_SECONDS
+
+EMBED_QUEUE_KEY = "embed:pending"
+EMBED_FLUSH_SCHEDULED_KEY = "embed:flush_scheduled"
+
+
+def enqueue_for_embedding(chunk_id: str):
+    # Summarized chunks from every document share one pending list. A batch is
+    # dispatched as soon as it is full, otherwise a delayed flush picks up
+    # whatever has accumulated within EMBED_BATCH_MAX_WAIT_SECONDS.
+    pending = redis_client.rpush(EMBED_QUEUE_KEY, chunk_id)
+
+    if pending >= EMBED_BATCH_SIZE:
+        chunk_ids = redis_client.lpop(EMBED_QUEUE_KEY, EMBED_BATCH_SIZE)
+        if chunk_ids:
+            embed_chunks.delay(chunk_ids)
+    elif redis_client.set(
+        EMBED_FLUSH_SCHEDULED_KEY,
+        1,
+        nx=True,
+        ex=int(EMBED_BATCH_MAX_WAIT_SECONDS * 10) + 60,
+    ):
+        flush_embed_queue.apply_async(countdown=EMBED_BATCH_MAX_WAIT_SECONDS)
+
+
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    # Repeated content (boilerplate pages, footers, slide templates) is served
+    # from the cache and only distinct unseen texts are sent to the GPU.
+    embeddings = get_cached_embeddings(texts)
+    missing = list(dict.fromkeys(t for t, e in zip(texts, embeddings) if e is None))
+
+    if missing:
+        vectors = gpu.embed(missing)
+
+        store_embeddings(missing, vectors)
+
+        computed = dict(zip(missing, vectors))
+        embeddings = [
+            e if e is not None else computed[t] for t, e in zip(texts, embeddings)
+        ]
+
+    return embeddings
+
+
+@celery_app.task
+def flush_embed_queue():
+    redis_client.delete(EMBED_FLUSH_SCHEDULED_KEY)
+
+    batches = 0
+    while True:
+        chunk_ids = redis_client.lpop(EMBED_QUEUE_KEY, EMBED_BATCH_SIZE)
+        if not chunk_ids:
+            break
+
+        embed_chunks.delay(chunk_ids)
+        batches += 1
+
+        if len(chunk_ids) < EMBED_BATCH_SIZE:
+            break
+
+    return {"status": "flushed", "batches": batches}
+
+
+def embed_chunk_batch(db, chunk_uuids: list[UUID]):
+    # Chunks already embedded or locked by a concurrent batch are skipped, so
+    # the same ids may safely be handed to more than one caller.
+    chunks = (
+        db.query(Chunk)
+        .filter(Chunk.id.in_(chunk_uuids), Chunk.status == "summarized")
+        .order_by(Chunk.id)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    if not chunks:
+        return 0, []
+
+    embeddings = embed_texts([c.summarised_content for c in chunks])
+
+    embedded_per_document = Counter()
+
+    for chunk, embedding in zip(chunks, embeddings):
+        chunk.embedding = embedding
+        chunk.status = "embedded"
+        embedded_per_document[chunk.document_id] += 1
+
+    events = []
+
+    # Update documents in a stable order so concurrent batches cannot deadlock.
+    for document_id in sorted(embedded_per_document, key=str):
+        progress = increment_chunks_embedded(
+            db, document_id, embedded_per_document[document_id]
+        )
+
+        if not progress:
+            continue
+
+        chunks_embedded, total_chunks, project_id = progress
+        events.append(
+            (
+                project_id,
+                "chunks_embedded",
+                {
+                    "document_id": document_id,
+                    "chunks_embedded": chunks_embedded,
+                    "total_chunks": total_chunks,
+                },
+            )
+        )
+
+    return len(chunks), events
+
+
+@celery_app.task(bind=True)
+def embed_chunks(self, chunk_ids: list[str], limited_retries: int = 0):
+    db = SessionLocal()
+
+    chunk_uuids = [UUID(chunk_id) for chunk_id in chunk_ids]
+    try:
+        embedded, events = embed_chunk_batch(db, chunk_uuids)
+
+        if not embedded:
+            return {"status": "already_processed"}
+
+        db.commit()
+
+        for project_id, event, data in events:
+            publish_progress(project_id, event, **data)
+
+        return {"status": "done", "embedded": embedded}
+
+    except Exception as e:
+        db.rollback()
+
+        if not is_backpressure(e) and failures_exhausted(self, limited_retries):
+            chunks = (
+                db.query(Chunk)
+                .filter(Chunk.id.in_(chunk_uuids), Chunk.status == "summarized")
+                .all()
+            )
+            for chunk in chunks:
+                chunk.status = "failed"
+
+            document_ids = {chunk.document_id for chunk in chunks}
+            failed_documents = (
+                db.query(Document).filter(Document.id.in_(document_ids)).all()
+                if document_ids
+                else []
+            )
+            for document in failed_documents:
+                document.status = "failed"
+            db.commit()
+
+            for document in failed_documents:
+                publish_progress(
+                    document.project_id, "document_failed", document_id=document.id
+                )
+
+            raise
+
+        raise retry_task(self, e, limited_retries)
+
+    finally:
+        db.close()
@@ -0,0 +1,106 @@
+from celery_app import celery_app
+from celery.exceptions import Retry
+from db import SessionLocal
+from models import Document, Chunk
+from uuid import UUID
+from config import settings
+from tasks.embed_chunks import EMBED_BATCH_SIZE, embed_chunk_batch
+from tasks.progress import mark_document_ready
+from utils.events import publish_progress
+
+FINALIZE_RETRY_SECONDS = settings.FINALIZE_RETRY_SECONDS
+
+
+@celery_app.task(bind=True, max_retries=settings.FINALIZE_MAX_RETRIES)
+def finalize_document(self, document_id: str):
+    # Runs once as the chord callback after every chunk of the document has
+    # been summarized. It is the only place a document is marked ready.
+    db = SessionLocal()
+
+    try:
+        doc_uuid = UUID(document_id)
+
+        document = db.query(Document).filter(Document.id == doc_uuid).first()
+
+        if not document:
+            return {"status": "error", "message": "Document not found"}
+
+        if document.status == "ready":
+            return {"status": "ready"}
+
+        # Readiness is decided from the chunks rather than the document
+        # status; only a chunk that exhausted its retries fails the document.
+        failed_chunk = (
+            db.query(Chunk.id)
+            .filter(Chunk.document_id == doc_uuid, Chunk.status == "failed")
+            .first()
+        )
+        if failed_chunk:
+            document.status = "failed"
+            db.commit()
+
+            publish_progress(
+                document.project_id, "document_failed", document_id=doc_uuid
+            )
+            return {"status": "failed"}
+
+        project_id = document.project_id
+
+        # The document's last chunks may still be waiting in the shared embed
+        # queue, so they are embedded here rather than after the batch timer.
+        pending_ids = [
+            chunk_id
+            for (chunk_id,) in db.query(Chunk.id)
+            .filter(Chunk.document_id == doc_uuid, Chunk.status == "summarized")
+            .all()
+        ]
+
+        events = []
+        for start in range(0, len(pending_ids), EMBED_BATCH_SIZE):
+            _, batch_events = embed_chunk_batch(
+                db, pending_ids[start : start + EMBED_BATCH_SIZE]
+            )
+            events.extend(batch_events)
+
+        db.commit()
+
+        for event_project_id, event, data in events:
+            publish_progress(event_project_id, event, **data)
+
+        db.refresh(document)
+
+        if document.chunks_embedded < document.total_chunks:
+            # Remaining chunks are locked by embed batches still in flight.
+            raise self.retry(countdown=FINALIZE_RETRY_SECONDS)
+
+        document_ready, project_ready = mark_document_ready(db, doc_uuid, project_id)
+        db.commit()
+
+        if document_ready:
+            publish_progress(project_id, "document_ready", document_id=doc_uuid)
+        if project_ready:
+            publish_progress(project_id, "project_ready")
+
+        return {"status": "ready"}
+
+    except Retry:
+        raise
+
+    except Exception as e:
+        db.rollback()
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=FINALIZE_RETRY_SECONDS)
+
+        document = db.query(Document).filter(Document.id == doc_uuid).first()
+        if document and document.status != "ready":
+            document.status = "failed"
+            db.commit()
+
+            publish_progress(
+                document.project_id, "document_failed", document_id=doc_uuid
+            )
+        raise
+
+    finally:
+        db.close()
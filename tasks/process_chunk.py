@@ -1,22 +1,17 @@
 from celery_app import celery_app
 from db import SessionLocal
-from models import Document, Chunk, Project, Image
+from models import Document, Chunk, Image
 from uuid import UUID
-import requests
-from config import settings
+from utils import gpu
 from utils.s3 import get_presigned_urls_for_chunk_images
+from tasks.embed_chunks import enqueue_for_embedding
+from tasks.progress import increment_chunks_summarized
+from utils.events import publish_progress
+from tasks.retry import failures_exhausted, is_backpressure, retry_task
 
-HF_ACCESS_TOKEN = settings.HF_ACCESS_TOKEN
-GPU_SERVICE_URL = settings.GPU_SERVICE_URL
 
-
-@celery_app.task(
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=10,
-    retry_kwargs={"max_retries": 3},
-)
-def process_chunk(self, chunk_id: str):
+@celery_app.task(bind=True)
+def process_chunk(self, chunk_id: str, limited_retries: int = 0):
     db = SessionLocal()
 
     summarized_text = ""
@@ -31,12 +26,9 @@ def process_chunk(self, chunk_id: str):
         if chunk.status == "embedded":
             return {"status": "already_processed"}
 
-        document = (
-            db.query(Document)
-            .filter(Document.id == chunk.document_id)
-            .with_for_update()
-            .first()
-        )
+        if chunk.status == "summarized":
+            enqueue_for_embedding(chunk_id)
+            return {"status": "already_summarized"}
 
         images = db.query(Image).filter(Image.chunk_id == chunk.id).all()
 
@@ -46,77 +38,54 @@ def process_chunk(self, chunk_id: str):
                 expires_in=900,
             )
 
-            summarize_resp = requests.post(
-                f"{GPU_SERVICE_URL}/summarize",
-                headers={"Authorization": f"Bearer {HF_ACCESS_TOKEN}"},
-                json={
-                    "chunk_text": chunk.content,
-                    "image_urls": image_urls,
-                },
-                timeout=500,
-            )
-            summarize_resp.raise_for_status()
-
-            summarized_text = summarize_resp.json()["summary_text"]
+            summarized_text = gpu.summarize(chunk.content, image_urls)
             chunk.summarised_content = summarized_text
         else:
             chunk.summarised_content = chunk.content
             summarized_text = chunk.content
 
         chunk.status = "summarized"
-        document.chunks_summarized += 1
-
-        embed_resp = requests.post(
-            f"{GPU_SERVICE_URL}/embed",
-            headers={"Authorization": f"Bearer {HF_ACCESS_TOKEN}"},
-            json={"summarized_text": summarized_text},
-            timeout=100,
-        )
-        embed_resp.raise_for_status()
-
-        embedding = embed_resp.json()["embedding_vector"]
-
-        chunk.embedding = embedding
-        chunk.status = "embedded"
-        document.chunks_embedded += 1
-
-        if document.chunks_embedded == document.total_chunks:
-            document.status = "ready"
-
-            project = (
-                db.query(Project)
-                .filter(Project.id == document.project_id)
-                .with_for_update()
-                .first()
-            )
+        document_id = chunk.document_id
+        progress = increment_chunks_summarized(db, document_id)
 
-            all_docs = (
-                db.query(Document).filter(Document.project_id == project.id).all()
-            )
+        db.commit()
 
-            if all(
-                d.status == "ready" and d.chunks_embedded == d.total_chunks
-                for d in all_docs
-            ):
-                project.status = "ready"
+        if progress:
+            chunks_summarized, total_chunks, project_id = progress
+            publish_progress(
+                project_id,
+                "chunk_summarized",
+                document_id=document_id,
+                chunk_id=chunk_id,
+                chunks_summarized=chunks_summarized,
+                total_chunks=total_chunks,
+            )
 
-        db.commit()
-        return {"status": "done"}
+        enqueue_for_embedding(chunk_id)
+        return {"status": "summarized"}
 
-    except:
+    except Exception as e:
         db.rollback()
 
-        chunk = db.query(Chunk).filter(Chunk.id == chunk_uuid).first()
-        if chunk:
-            chunk.status = "failed"
-            document = (
-                db.query(Document).filter(Document.id == chunk.document_id).first()
-            )
-            if document:
-                document.status = "failed"
-            db.commit()
-
-        raise
+        if not is_backpressure(e) and failures_exhausted(self, limited_retries):
+            chunk = db.query(Chunk).filter(Chunk.id == chunk_uuid).first()
+            if chunk:
+                chunk.status = "failed"
+                document = (
+                    db.query(Document).filter(Document.id == chunk.document_id).first()
+                )
+                if document:
+                    document.status = "failed"
+                db.commit()
+
+                if document:
+                    publish_progress(
+                        document.project_id, "document_failed", document_id=document.id
+                    )
+
+            raise
+
+        raise retry_task(self, e, limited_retries)
 
     finally:
         db.close()
@@ -1,10 +1,88 @@
+from celery import chord
 from celery_app import celery_app
 from db import SessionLocal
 from models import Document, Chunk, Image, Project
 from uuid import UUID
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, select
+import uuid
 from utils.parse import chunk_document
 from tasks.process_chunk import process_chunk
-from utils.s3 import upload_image_to_s3
+from tasks.finalize_document import finalize_document
+from tasks.progress import mark_document_ready
+from utils.events import publish_progress
+from utils.s3 import upload_images_to_s3
+
+
+def delete_document_chunks(db, document_id):
+    # Rows from an earlier attempt would otherwise linger in listings and
+    # search, and their failed chunks would fail the new run at finalize.
+    db.execute(
+        delete(Image).where(
+            Image.chunk_id.in_(select(Chunk.id).where(Chunk.document_id == document_id))
+        )
+    )
+    db.execute(delete(Chunk).where(Chunk.document_id == document_id))
+
+
+def clone_processed_document(db, source_document_id, document_id):
+    # Identical content yields identical chunks, summaries and embeddings, so
+    # they are copied instead of re-parsed and re-run through the GPU service.
+    # Image objects in S3 are shared with the source document.
+    source_chunks = (
+        db.query(Chunk)
+        .filter(Chunk.document_id == source_document_id)
+        .order_by(Chunk.created_at.asc())
+        .all()
+    )
+
+    source_images = (
+        db.query(Image).filter(Image.chunk_id.in_([c.id for c in source_chunks])).all()
+        if source_chunks
+        else []
+    )
+
+    created_at = datetime.utcnow()
+    chunk_ids = {}
+    chunk_rows = []
+
+    for index, chunk in enumerate(source_chunks):
+        chunk_ids[chunk.id] = uuid.uuid4()
+
+        chunk_rows.append(
+            {
+                "id": chunk_ids[chunk.id],
+                "document_id": document_id,
+                "content": chunk.content,
+                "summarised_content": chunk.summarised_content,
+                "embedding": chunk.embedding,
+                "page_number": chunk.page_number,
+                "has_text": chunk.has_text,
+                "has_image": chunk.has_image,
+                "has_table": chunk.has_table,
+                "status": "embedded",
+                "created_at": created_at + timedelta(microseconds=index),
+            }
+        )
+
+    image_rows = [
+        {
+            "id": uuid.uuid4(),
+            "chunk_id": chunk_ids[image.chunk_id],
+            "s3_key": image.s3_key,
+            "original_size": image.original_size,
+            "stored_size": image.stored_size,
+            "created_at": created_at,
+        }
+        for image in source_images
+    ]
+
+    if chunk_rows:
+        db.execute(insert(Chunk), chunk_rows)
+    if image_rows:
+        db.execute(insert(Image), image_rows)
+
+    return len(chunk_rows)
 
 
 @celery_app.task(
@@ -34,57 +112,155 @@ def process_document(self, project_id: str, document_id: str):
         if not project:
             return {"status": "error", "message": "Project not found"}
 
+        source_document = None
+        if document.content_hash:
+            source_document = (
+                db.query(Document)
+                .filter(
+                    Document.content_hash == document.content_hash,
+                    Document.id != doc_uuid,
+                    Document.status == "ready",
+                )
+                .order_by(Document.created_at.asc())
+                .first()
+            )
+
+        if source_document:
+            delete_document_chunks(db, doc_uuid)
+            total_chunks = clone_processed_document(db, source_document.id, doc_uuid)
+
+            document.total_chunks = total_chunks
+            document.chunks_summarized = total_chunks
+            document.chunks_embedded = total_chunks
+            db.flush()
+
+            document_ready, project_ready = mark_document_ready(
+                db, doc_uuid, project_uuid
+            )
+            db.commit()
+
+            if document_ready:
+                publish_progress(project_uuid, "document_ready", document_id=doc_uuid)
+            if project_ready:
+                publish_progress(project_uuid, "project_ready")
+
+            return {
+                "status": "success",
+                "message": "Chunks cloned from identical document",
+            }
+
         document.status = "chunking"
         db.commit()
 
-        chunks = chunk_document(document)
+        publish_progress(project_uuid, "document_chunking", document_id=doc_uuid)
 
-        for chunk in chunks:
-            new_chunk = Chunk(
-                document_id=document.id,
-                content=chunk["content"],
-                page_number=chunk["page_number"],
-                has_text="text" in chunk["type"],
-                has_image="image" in chunk["type"],
-                has_table="table" in chunk["type"],
-            )
+        # Nothing below needs the database until the rows are written, so the
+        # connection is released while parsing and uploading images.
+        db.refresh(document)
+        user_id = project.user_id
+        db.close()
 
-            db.add(new_chunk)
-            db.flush()
+        chunks, image_usage = chunk_document(document)
 
-            for image_path in chunk.get("images", []):
-                upload_result = upload_image_to_s3(
-                    image_path=image_path,
-                    user_id=project.user_id,
-                    project_id=project_uuid,
-                    document_id=doc_uuid,
-                    chunk_id=new_chunk.id,
-                    page_number=new_chunk.page_number,
-                )
+        # Rows are built in memory with pre-generated ids so that chunks and
+        # images each go out as a single multi-row INSERT. created_at is
+        # staggered to keep page order stable for listings.
+        created_at = datetime.utcnow()
+        chunk_rows = []
+        image_uploads = []
+        original_sizes = []
+
+        for index, chunk in enumerate(chunks):
+            chunk_id = uuid.uuid4()
 
-                if upload_result["status"] != "uploaded":
-                    raise RuntimeError(
-                        f"Image upload failed: {upload_result.get('error')}"
-                    )
+            chunk_rows.append(
+                {
+                    "id": chunk_id,
+                    "document_id": doc_uuid,
+                    "content": chunk["content"],
+                    "page_number": chunk["page_number"],
+                    "has_text": "text" in chunk["type"],
+                    "has_image": "image" in chunk["type"],
+                    "has_table": "table" in chunk["type"],
+                    "status": "created",
+                    "created_at": created_at + timedelta(microseconds=index),
+                }
+            )
 
-                db.add(
-                    Image(
-                        chunk_id=new_chunk.id,
-                        s3_key=upload_result.get("s3_key"),
-                    )
+            for image in chunk.get("images", []):
+                image_uploads.append(
+                    {
+                        "image_content": image["content"],
+                        "image_filename": image["filename"],
+                        "user_id": user_id,
+                        "project_id": project_uuid,
+                        "document_id": doc_uuid,
+                        "chunk_id": chunk_id,
+                        "page_number": chunk["page_number"],
+                    }
                 )
+                original_sizes.append(image["original_size"])
 
-        document.total_chunks = len(chunks)
+        upload_results = upload_images_to_s3(image_uploads)
+
+        failed_uploads = [r for r in upload_results if r["status"] != "uploaded"]
+        if failed_uploads:
+            errors = "; ".join(f"{r['filename']}: {r['error']}" for r in failed_uploads)
+            raise RuntimeError(
+                f"{len(failed_uploads)} of {len(upload_results)} image uploads failed: {errors}"
+            )
+
+        image_rows = [
+            {
+                "id": uuid.uuid4(),
+                "chunk_id": upload["chunk_id"],
+                "s3_key": result["s3_key"],
+                "original_size": original_size,
+                "stored_size": result["size"],
+                "created_at": created_at,
+            }
+            for upload, result, original_size in zip(
+                image_uploads, upload_results, original_sizes
+            )
+        ]
+        image_usage["image_bytes_stored"] = sum(r["size"] for r in upload_results)
+
+        delete_document_chunks(db, doc_uuid)
+
+        if chunk_rows:
+            db.execute(insert(Chunk), chunk_rows)
+        if image_rows:
+            db.execute(insert(Image), image_rows)
+
+        document = db.query(Document).filter(Document.id == doc_uuid).first()
+        document.total_chunks = len(chunk_rows)
         document.chunks_summarized = 0
         document.chunks_embedded = 0
         document.status = "processing"
 
         db.commit()
 
-        for chunk in db.query(Chunk).filter(Chunk.document_id == document.id).all():
-            process_chunk.delay(str(chunk.id))
+        publish_progress(
+            project_uuid,
+            "document_processing",
+            document_id=doc_uuid,
+            total_chunks=len(chunk_rows),
+        )
 
-        return {"status": "success", "message": "Chunks created and queued"}
+        # The chord header goes out over a single producer connection and the
+        # callback fires once, after the last chunk has been summarized.
+        if chunk_rows:
+            chord(process_chunk.s(str(row["id"])) for row in chunk_rows)(
+                finalize_document.si(document_id)
+            )
+        else:
+            finalize_document.delay(document_id)
+
+        return {
+            "status": "success",
+            "message": "Chunks created and queued",
+            **image_usage,
+        }
 
     except Exception as e:
         db.rollback()
@@ -92,6 +268,8 @@ def process_document(self, project_id: str, document_id: str):
         if document:
             document.status = "failed"
             db.commit()
+
+            publish_progress(project_uuid, "document_failed", document_id=doc_uuid)
         raise
 
     finally:
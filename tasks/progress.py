@@ -0,0 +1,52 @@
+from sqlalchemy import update
+from models import Document, Project
+
+
+def increment_chunks_summarized(db, document_id, count: int = 1):
+    return db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(chunks_summarized=Document.chunks_summarized + count)
+        .returning(
+            Document.chunks_summarized, Document.total_chunks, Document.project_id
+        )
+    ).first()
+
+
+def increment_chunks_embedded(db, document_id, count: int = 1):
+    return db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(chunks_embedded=Document.chunks_embedded + count)
+        .returning(
+            Document.chunks_embedded, Document.total_chunks, Document.project_id
+        )
+    ).first()
+
+
+def mark_document_ready(db, document_id, project_id):
+    # Only the transition into "ready" counts towards the project, so a
+    # document that is finalized twice is not counted twice. Returns whether
+    # the document and the project became ready.
+    transitioned = db.execute(
+        update(Document)
+        .where(Document.id == document_id, Document.status != "ready")
+        .values(status="ready")
+        .returning(Document.id)
+    ).first()
+
+    if not transitioned:
+        return False, False
+
+    documents_ready, documents_total = db.execute(
+        update(Project)
+        .where(Project.id == project_id)
+        .values(documents_ready=Project.documents_ready + 1)
+        .returning(Project.documents_ready, Project.documents_total)
+    ).one()
+
+    if documents_ready < documents_total:
+        return True, False
+
+    db.execute(update(Project).where(Project.id == project_id).values(status="ready"))
+    return True, True
@@ -0,0 +1,36 @@
+from celery.utils.time import get_exponential_backoff_interval
+from config import settings
+from utils import gpu
+
+TASK_MAX_FAILURES = 3
+TASK_RETRY_BACKOFF_SECONDS = 10
+TASK_RETRY_BACKOFF_MAX_SECONDS = 600
+
+
+def is_backpressure(exc: Exception) -> bool:
+    return isinstance(exc, gpu.GPUConcurrencyLimited)
+
+
+def failures_exhausted(task, limited_retries: int) -> bool:
+    # Retries spent waiting on the GPU limiter do not count as failures.
+    return task.request.retries - limited_retries >= TASK_MAX_FAILURES
+
+
+def retry_task(task, exc: Exception, limited_retries: int):
+    # Limiter rejections are backpressure rather than failures: they retry
+    # without limit, and the count of them rides along in the task kwargs so
+    # real failures keep their own budget and exponential backoff.
+    kwargs = dict(task.request.kwargs or {})
+
+    if is_backpressure(exc):
+        kwargs["limited_retries"] = limited_retries + 1
+        countdown = settings.GPU_LIMIT_RETRY_SECONDS
+    else:
+        countdown = get_exponential_backoff_interval(
+            TASK_RETRY_BACKOFF_SECONDS,
+            task.request.retries - limited_retries,
+            TASK_RETRY_BACKOFF_MAX_SECONDS,
+            full_jitter=True,
+        )
+
+    return task.retry(exc=exc, countdown=countdown, max_retries=None, kwargs=kwargs)
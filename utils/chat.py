@@ -0,0 +1,21 @@
+SYSTEM_PROMPT = (
+    "You are a helpful assistant answering questions about the user's documents. "
+    "Answer using only the provided context. If the context does not contain the "
+    "answer, say that you do not know. Cite page numbers where relevant."
+)
+
+
+def build_chat_messages(history, context_chunks: list[dict], question: str):
+    context = "\n\n".join(
+        f"[Page {chunk['page_number']}]\n{chunk['summarised_content'] or chunk['content']}"
+        for chunk in context_chunks
+    )
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        *[{"role": m.role, "content": m.content} for m in history],
+        {
+            "role": "user",
+            "content": f"Context:\n{context}\n\nQuestion: {question}",
+        },
+    ]
@@ -0,0 +1,93 @@
+from array import array
+from config import settings
+from utils.redis_client import redis_client
+import base64
+import hashlib
+import time
+
+EMBEDDING_MODEL = settings.EMBEDDING_MODEL
+EMBEDDING_CACHE_MAX_ENTRIES = settings.EMBEDDING_CACHE_MAX_ENTRIES
+
+CACHE_KEY_PREFIX = f"embed_cache:{EMBEDDING_MODEL}"
+CACHE_INDEX_KEY = f"{CACHE_KEY_PREFIX}:lru"
+CACHE_HITS_KEY = f"{CACHE_KEY_PREFIX}:hits"
+CACHE_MISSES_KEY = f"{CACHE_KEY_PREFIX}:misses"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _encode(vector) -> str:
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def _decode(value: str) -> list[float]:
+    vector = array("f")
+    vector.frombytes(base64.b64decode(value))
+    return vector.tolist()
+
+
+def get_cached_embeddings(texts: list[str]) -> list[list[float] | None]:
+    if not texts:
+        return []
+
+    hashes = [_text_hash(text) for text in texts]
+    values = redis_client.mget([f"{CACHE_KEY_PREFIX}:{h}" for h in hashes])
+
+    embeddings = [_decode(v) if v is not None else None for v in values]
+    hits = [h for h, v in zip(hashes, values) if v is not None]
+
+    pipe = redis_client.pipeline(transaction=False)
+    if hits:
+        now = time.time()
+        pipe.zadd(CACHE_INDEX_KEY, {h: now for h in hits})
+    pipe.incrby(CACHE_HITS_KEY, len(hits))
+    pipe.incrby(CACHE_MISSES_KEY, len(texts) - len(hits))
+    pipe.execute()
+
+    return embeddings
+
+
+def store_embeddings(texts: list[str], embeddings: list[list[float]]):
+    if not texts:
+        return
+
+    now = time.time()
+    pipe = redis_client.pipeline(transaction=False)
+
+    for text, embedding in zip(texts, embeddings):
+        text_hash = _text_hash(text)
+        pipe.set(f"{CACHE_KEY_PREFIX}:{text_hash}", _encode(embedding))
+        pipe.zadd(CACHE_INDEX_KEY, {text_hash: now})
+
+    pipe.execute()
+
+    _evict_least_recently_used()
+
+
+def _evict_least_recently_used():
+    overflow = redis_client.zcard(CACHE_INDEX_KEY) - EMBEDDING_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return
+
+    stale = redis_client.zrange(CACHE_INDEX_KEY, 0, overflow - 1)
+    if not stale:
+        return
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.delete(*[f"{CACHE_KEY_PREFIX}:{h}" for h in stale])
+    pipe.zrem(CACHE_INDEX_KEY, *stale)
+    pipe.execute()
+
+
+def get_embedding_cache_stats():
+    hits, misses = redis_client.mget([CACHE_HITS_KEY, CACHE_MISSES_KEY])
+
+    return {
+        "model": EMBEDDING_MODEL,
+        "entries": redis_client.zcard(CACHE_INDEX_KEY),
+        "max_entries": EMBEDDING_CACHE_MAX_ENTRIES,
+        "hits": int(hits or 0),
+        "misses": int(misses or 0),
+    }
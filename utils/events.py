@@ -0,0 +1,45 @@
+from config import settings
+from utils.redis_client import redis_client, async_redis_client
+import json
+import logging
+
+PROGRESS_KEEPALIVE_SECONDS = settings.PROGRESS_KEEPALIVE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def progress_channel(project_id) -> str:
+    return f"progress:{project_id}"
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def publish_progress(project_id, event: str, **data):
+    # Progress events are best effort; a Redis hiccup must never fail the task
+    # that produced them.
+    try:
+        redis_client.publish(
+            progress_channel(project_id),
+            json.dumps({"event": event, **data}, default=str),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} for project {project_id}: {str(e)}")
+
+
+async def relay_progress(project_id, request):
+    async with async_redis_client.pubsub() as pubsub:
+        await pubsub.subscribe(progress_channel(project_id))
+
+        while not await request.is_disconnected():
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=PROGRESS_KEEPALIVE_SECONDS
+            )
+
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+
+            data = json.loads(message["data"])
+            yield format_sse(data.pop("event"), data)
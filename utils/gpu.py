@@ -0,0 +1,353 @@
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from config import settings
+from utils.gpu_limiter import (
+    AdaptiveLimiter,
+    acquire_least_loaded,
+    count_leases,
+    release_lease,
+)
+import json
+import random
+import requests
+import threading
+import time
+
+GPU_SERVICE_URLS = [
+    url.strip().rstrip("/")
+    for url in settings.GPU_SERVICE_URLS.split(",")
+    if url.strip()
+] or [settings.GPU_SERVICE_URL.strip().rstrip("/")]
+HF_ACCESS_TOKEN = settings.HF_ACCESS_TOKEN
+
+TIMEOUTS = {
+    "/summarize": settings.GPU_SUMMARIZE_TIMEOUT_SECONDS,
+    "/embed": settings.GPU_EMBED_TIMEOUT_SECONDS,
+    "/health": settings.GPU_HEALTH_TIMEOUT_SECONDS,
+    "/generate": settings.GPU_GENERATE_TIMEOUT_SECONDS,
+}
+
+
+class GPUServiceUnavailable(Exception):
+    pass
+
+
+class GPUConcurrencyLimited(GPUServiceUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    # Opens after `failure_threshold` consecutive failures and rejects calls
+    # until `reset_timeout` has passed, then lets a single trial call through.
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class GPUEndpoint:
+    # One GPU service backend with its own breaker and smoothed latency per
+    # path. Requests in flight are leases in Redis, counted across workers.
+    def __init__(self, url: str):
+        self.url = url
+        self.inflight_key = f"gpu_endpoint:{url}:inflight"
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.GPU_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.GPU_BREAKER_RESET_SECONDS,
+        )
+        self.latency = {}
+        self.ejected_until = 0.0
+
+    @property
+    def ejected(self) -> bool:
+        return time.monotonic() < self.ejected_until
+
+
+# One keep-alive session per process; Celery workers fork before any
+# connection is opened, so each child builds its own pool.
+session = requests.Session()
+session.headers.update({"Authorization": f"Bearer {HF_ACCESS_TOKEN}"})
+
+adapter = HTTPAdapter(
+    pool_connections=max(1, len(GPU_SERVICE_URLS)),
+    pool_maxsize=settings.GPU_POOL_SIZE,
+)
+session.mount("http://", adapter)
+session.mount("https://", adapter)
+
+endpoints = [GPUEndpoint(url) for url in GPU_SERVICE_URLS]
+endpoints_lock = threading.Lock()
+
+
+# Batch work from the summarize and embed queues is throttled. Interactive
+# calls (chat generation, query embedding, health probes) bypass the limiters.
+limiters = {
+    "/summarize": AdaptiveLimiter(
+        "summarize",
+        target_latency=settings.GPU_SUMMARIZE_TARGET_LATENCY_SECONDS,
+        lease_ttl=settings.GPU_CONNECT_TIMEOUT_SECONDS + TIMEOUTS["/summarize"],
+    ),
+    "/embed": AdaptiveLimiter(
+        "embed",
+        target_latency=settings.GPU_EMBED_TARGET_LATENCY_SECONDS,
+        lease_ttl=settings.GPU_CONNECT_TIMEOUT_SECONDS + TIMEOUTS["/embed"],
+    ),
+}
+
+
+def _select_endpoint(path: str):
+    # Ejection never takes every backend out of rotation.
+    admitted = [e for e in endpoints if not e.ejected] or endpoints
+    candidates = [e for e in admitted if e.breaker.state != "open"]
+    random.shuffle(candidates)
+
+    lease_ttl = settings.GPU_CONNECT_TIMEOUT_SECONDS + TIMEOUTS[path]
+
+    # Fewest requests in flight across every worker wins, ties at random.
+    while candidates:
+        index, lease_id = acquire_least_loaded(
+            [e.inflight_key for e in candidates], lease_ttl
+        )
+        endpoint = candidates.pop(index)
+
+        # Half-open breakers take one trial call at a time.
+        if endpoint.breaker.allow_request():
+            return endpoint, lease_id
+
+        release_lease(endpoint.inflight_key, lease_id)
+
+    return None, None
+
+
+def _record_result(endpoint: GPUEndpoint, path: str, latency: float, failed: bool):
+    with endpoints_lock:
+        if failed:
+            endpoint.breaker.record_failure()
+            return
+
+        endpoint.breaker.record_success()
+
+        if path == "/health":
+            return
+
+        previous = endpoint.latency.get(path)
+        endpoint.latency[path] = (
+            latency
+            if previous is None
+            else previous + settings.GPU_LATENCY_EWMA_ALPHA * (latency - previous)
+        )
+
+        # A backend far slower than its fastest admitted peer is taken out of
+        # rotation for a while and re-admitted with a fresh latency estimate.
+        peers = [
+            e.latency[path]
+            for e in endpoints
+            if e is not endpoint and not e.ejected and path in e.latency
+        ]
+        if peers and endpoint.latency[path] > settings.GPU_SLOW_EJECTION_FACTOR * min(
+            peers
+        ):
+            endpoint.ejected_until = time.monotonic() + settings.GPU_EJECTION_SECONDS
+            del endpoint.latency[path]
+
+
+def _send(
+    endpoint: GPUEndpoint,
+    method: str,
+    path: str,
+    lease_id: str | None = None,
+    **kwargs,
+):
+    started = time.monotonic()
+    failed = True
+
+    try:
+        response = session.request(
+            method,
+            f"{endpoint.url}{path}",
+            timeout=(settings.GPU_CONNECT_TIMEOUT_SECONDS, TIMEOUTS[path]),
+            **kwargs,
+        )
+        failed = response.status_code >= 500
+    finally:
+        if lease_id:
+            release_lease(endpoint.inflight_key, lease_id)
+        _record_result(endpoint, path, time.monotonic() - started, failed)
+
+    return response
+
+
+def _request(
+    method: str, path: str, throttle: bool = True, **kwargs
+) -> requests.Response:
+    if all(e.breaker.state == "open" for e in endpoints):
+        raise GPUServiceUnavailable(
+            f"All GPU service circuits are open, skipping {path}"
+        )
+
+    limiter = limiters.get(path) if throttle else None
+    lease_id = limiter.acquire() if limiter else None
+
+    if limiter and lease_id is None:
+        raise GPUConcurrencyLimited(f"GPU concurrency limit reached, skipping {path}")
+
+    endpoint, endpoint_lease_id = _select_endpoint(path)
+
+    if endpoint is None:
+        if lease_id:
+            limiter.release(lease_id, 0.0, overloaded=True)
+        raise GPUServiceUnavailable(f"No GPU service endpoint available for {path}")
+
+    started = time.monotonic()
+    overloaded = True
+
+    try:
+        response = _send(endpoint, method, path, lease_id=endpoint_lease_id, **kwargs)
+        overloaded = response.status_code == 429 or response.status_code >= 500
+    finally:
+        if lease_id:
+            limiter.release(lease_id, time.monotonic() - started, overloaded)
+
+    return response
+
+
+def summarize(chunk_text: str, image_urls: list[str]) -> str:
+    response = _request(
+        "POST",
+        "/summarize",
+        json={"chunk_text": chunk_text, "image_urls": image_urls},
+    )
+    response.raise_for_status()
+
+    return response.json()["summary_text"]
+
+
+def embed(texts: list[str], throttle: bool = True) -> list[list[float]]:
+    response = _request(
+        "POST", "/embed", throttle=throttle, json={"summarized_texts": texts}
+    )
+    response.raise_for_status()
+
+    embeddings = response.json()["embedding_vectors"]
+
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+
+    return embeddings
+
+
+def open_generate_stream(messages: list[dict]) -> requests.Response:
+    # The service streams newline-delimited JSON objects, one per token; the
+    # read timeout applies between tokens rather than to the whole answer.
+    response = _request(
+        "POST",
+        "/generate",
+        json={"messages": messages, "stream": True},
+        stream=True,
+    )
+
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        response.close()
+        raise
+
+    return response
+
+
+def iter_tokens(response: requests.Response):
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        yield json.loads(line)["token"]
+
+
+def abort_stream(response: requests.Response):
+    # Shutting the socket down unblocks a read in progress on another thread,
+    # which close() alone would wait behind. A response that already finished
+    # has returned its connection to the pool and is only closed.
+    try:
+        response.raw.shutdown()
+    except (ValueError, RuntimeError):
+        pass
+
+    response.close()
+
+
+def _check_endpoint_health(endpoint: GPUEndpoint) -> str:
+    # Probes go to every backend directly, so a half-open breaker can be
+    # closed again by a successful health check.
+    if not endpoint.breaker.allow_request():
+        return "circuit_open"
+
+    try:
+        response = _send(endpoint, "GET", "/health")
+    except requests.exceptions.Timeout:
+        return "timeout"
+    except requests.exceptions.ConnectionError:
+        return "unreachable"
+    except requests.exceptions.RequestException:
+        return "error"
+
+    return "healthy" if response.status_code == 200 else "unhealthy"
+
+
+def check_health() -> dict:
+    if not endpoints:
+        return {"status": "not_configured", "endpoints": {}}
+
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        statuses = list(executor.map(_check_endpoint_health, endpoints))
+
+    if all(s == "healthy" for s in statuses):
+        status = "healthy"
+    elif any(s == "healthy" for s in statuses):
+        status = "degraded"
+    else:
+        status = statuses[0]
+
+    return {
+        "status": status,
+        "endpoints": {
+            endpoint.url: {
+                "status": endpoint_status,
+                "in_flight": count_leases(endpoint.inflight_key),
+                "ejected": endpoint.ejected,
+            }
+            for endpoint, endpoint_status in zip(endpoints, statuses)
+        },
+    }
@@ -0,0 +1,129 @@
+from config import settings
+from utils.redis_client import redis_client
+import time
+import uuid
+
+LIMIT_KEY_PREFIX = "gpu_limit"
+
+# Leases live in a sorted set scored by expiry so a worker that dies mid-call
+# only holds its slot until the lease runs out.
+ACQUIRE_SCRIPT = redis_client.register_script("""
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local lease_ttl = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+
+local limit = tonumber(redis.call('GET', KEYS[2]) or ARGV[3])
+if redis.call('ZCARD', KEYS[1]) >= math.max(1, math.floor(limit)) then
+    return 0
+end
+
+redis.call('ZADD', KEYS[1], now + lease_ttl, ARGV[1])
+redis.call('EXPIRE', KEYS[1], math.ceil(lease_ttl))
+return 1
+""")
+
+# Additive increase of one slot per window of successful calls, multiplicative
+# decrease on overload. Decreases are rate limited so that one slow spell seen
+# by many concurrent calls only halves the limit once.
+RELEASE_SCRIPT = redis_client.register_script("""
+redis.call('ZREM', KEYS[1], ARGV[1])
+
+local limit = tonumber(redis.call('GET', KEYS[2]) or ARGV[3])
+local min_limit = tonumber(ARGV[4])
+local max_limit = tonumber(ARGV[5])
+
+if ARGV[2] == '1' then
+    if redis.call('SET', KEYS[3], 1, 'NX', 'PX', ARGV[7]) then
+        limit = math.max(min_limit, limit * tonumber(ARGV[6]))
+    end
+else
+    limit = math.min(max_limit, limit + 1 / limit)
+end
+
+redis.call('SET', KEYS[2], limit)
+return tostring(limit)
+""")
+
+# Picks the key with the fewest live leases and takes a lease on it. Callers
+# pass the keys in random order, so ties are broken randomly.
+SELECT_SCRIPT = redis_client.register_script("""
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local lease_ttl = tonumber(ARGV[2])
+
+local best, best_count = nil, nil
+for index, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    local count = redis.call('ZCARD', key)
+    if best_count == nil or count < best_count then
+        best, best_count = index, count
+    end
+end
+
+redis.call('ZADD', KEYS[best], now + lease_ttl, ARGV[1])
+redis.call('EXPIRE', KEYS[best], math.ceil(lease_ttl))
+return best
+""")
+
+
+def acquire_least_loaded(keys: list[str], lease_ttl: float) -> tuple[int, str]:
+    lease_id = uuid.uuid4().hex
+    index = SELECT_SCRIPT(keys=keys, args=[lease_id, lease_ttl])
+    return int(index) - 1, lease_id
+
+
+def release_lease(key: str, lease_id: str):
+    redis_client.zrem(key, lease_id)
+
+
+def count_leases(key: str) -> int:
+    return redis_client.zcount(key, time.time(), "+inf")
+
+
+class AdaptiveLimiter:
+    # AIMD limit on in-flight calls to one GPU endpoint, shared by every
+    # worker through Redis. A call counts as overloaded when it fails, gets a
+    # 429 or 5xx, or takes longer than `target_latency`.
+    def __init__(self, name: str, target_latency: float, lease_ttl: float):
+        self.name = name
+        self.target_latency = target_latency
+        self.lease_ttl = lease_ttl
+        self.inflight_key = f"{LIMIT_KEY_PREFIX}:{name}:inflight"
+        self.limit_key = f"{LIMIT_KEY_PREFIX}:{name}:limit"
+        self.decreased_key = f"{LIMIT_KEY_PREFIX}:{name}:decreased"
+
+    def acquire(self, timeout: float = settings.GPU_LIMIT_ACQUIRE_TIMEOUT_SECONDS):
+        lease_id = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+
+        while True:
+            acquired = ACQUIRE_SCRIPT(
+                keys=[self.inflight_key, self.limit_key],
+                args=[lease_id, self.lease_ttl, settings.GPU_LIMIT_INITIAL],
+            )
+            if acquired:
+                return lease_id
+
+            if time.monotonic() >= deadline:
+                return None
+
+            time.sleep(settings.GPU_LIMIT_POLL_SECONDS)
+
+    def release(self, lease_id: str, latency: float, overloaded: bool) -> float:
+        overloaded = overloaded or latency > self.target_latency
+
+        limit = RELEASE_SCRIPT(
+            keys=[self.inflight_key, self.limit_key, self.decreased_key],
+            args=[
+                lease_id,
+                1 if overloaded else 0,
+                settings.GPU_LIMIT_INITIAL,
+                settings.GPU_LIMIT_MIN,
+                settings.GPU_LIMIT_MAX,
+                settings.GPU_LIMIT_DECREASE_FACTOR,
+                int(settings.GPU_LIMIT_DECREASE_COOLDOWN_SECONDS * 1000),
+            ],
+        )
+        return float(limit)
@@ -0,0 +1,95 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from datetime import datetime, timezone
+from config import settings
+from db import async_engine
+from utils import gpu
+from utils.redis_client import async_redis_client
+from utils.embedding_cache import get_embedding_cache_stats
+from utils.s3 import s3_client, S3_BUCKET
+import asyncio
+import logging
+import time
+
+HEALTH_CHECK_INTERVAL_SECONDS = settings.HEALTH_CHECK_INTERVAL_SECONDS
+HEALTH_CHECK_TIMEOUT_SECONDS = settings.HEALTH_CHECK_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Latest probe results, served as-is by /api/health.
+health_snapshot = {"status": "unknown", "services": {}, "embedding_cache": None}
+
+
+async def _check_gpu_service():
+    return await run_in_threadpool(gpu.check_health)
+
+
+async def _check_database():
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return "healthy"
+
+
+async def _check_redis():
+    await async_redis_client.ping()
+    return "healthy"
+
+
+async def _check_s3():
+    await run_in_threadpool(s3_client.head_bucket, Bucket=S3_BUCKET)
+    return "healthy"
+
+
+CHECKS = {
+    "gpu_service": _check_gpu_service,
+    "database": _check_database,
+    "redis": _check_redis,
+    "s3": _check_s3,
+}
+
+
+async def _run_check(check):
+    # Checks return a status string, or a dict with a status and details.
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(check(), timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        result = "timeout"
+    except Exception as e:
+        logger.warning(f"Health check {check.__name__} failed: {str(e)}")
+        result = "unreachable"
+
+    return {
+        **(result if isinstance(result, dict) else {"status": result}),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def probe_services():
+    results = await asyncio.gather(*[_run_check(check) for check in CHECKS.values()])
+    services = dict(zip(CHECKS.keys(), results))
+
+    health_snapshot["services"] = services
+    health_snapshot["status"] = (
+        "healthy"
+        if all(s["status"] == "healthy" for s in services.values())
+        else "degraded"
+    )
+
+    try:
+        health_snapshot["embedding_cache"] = await run_in_threadpool(
+            get_embedding_cache_stats
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read embedding cache stats: {str(e)}")
+
+
+async def run_health_prober():
+    while True:
+        try:
+            await probe_services()
+        except Exception as e:
+            logger.error(f"Health prober failed: {str(e)}")
+
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
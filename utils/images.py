@@ -0,0 +1,80 @@
+from PIL import Image as PILImage
+from billiard.pool import Pool
+from config import settings
+import io
+import logging
+import os
+
+IMAGE_NORMALIZE_ENABLED = settings.IMAGE_NORMALIZE_ENABLED
+IMAGE_MAX_DIMENSION = settings.IMAGE_MAX_DIMENSION
+IMAGE_OUTPUT_FORMAT = settings.IMAGE_OUTPUT_FORMAT
+IMAGE_OUTPUT_QUALITY = settings.IMAGE_OUTPUT_QUALITY
+IMAGE_NORMALIZE_MAX_WORKERS = settings.IMAGE_NORMALIZE_MAX_WORKERS
+
+# Everything that changes normalized output; part of the parse cache key.
+NORMALIZE_OPTIONS = {
+    "enabled": IMAGE_NORMALIZE_ENABLED,
+    "max_dimension": IMAGE_MAX_DIMENSION,
+    "format": IMAGE_OUTPUT_FORMAT,
+    "quality": IMAGE_OUTPUT_QUALITY,
+}
+
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_image(content: bytes, filename: str) -> tuple[bytes, str]:
+    # Downscales to IMAGE_MAX_DIMENSION on the longest side and re-encodes.
+    # The original is kept when re-encoding would not make it smaller.
+    pil_format, extension = OUTPUT_FORMATS[IMAGE_OUTPUT_FORMAT]
+
+    with PILImage.open(io.BytesIO(content)) as image:
+        image.load()
+        resized = max(image.size) > IMAGE_MAX_DIMENSION
+        if resized:
+            image.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            # JPEG has no alpha channel; transparent areas become white.
+            rgba = image.convert("RGBA")
+            image = PILImage.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+
+        output = io.BytesIO()
+        image.save(output, format=pil_format, quality=IMAGE_OUTPUT_QUALITY)
+
+    if not resized and output.tell() >= len(content):
+        return content, filename
+
+    return output.getvalue(), f"{os.path.splitext(filename)[0]}{extension}"
+
+
+def _normalize_or_keep(args: tuple[bytes, str]) -> tuple[bytes, str]:
+    content, filename = args
+    try:
+        return normalize_image(content, filename)
+    except Exception as e:
+        logger.warning(f"Failed to normalize image {filename}: {str(e)}")
+        return content, filename
+
+
+def normalize_images(images: list[tuple[bytes, str]]) -> list[tuple[bytes, str]]:
+    # Takes and returns (content, filename) pairs in the same order. Images
+    # that cannot be decoded are passed through unchanged.
+    if not IMAGE_NORMALIZE_ENABLED or not images:
+        return images
+
+    # billiard is Celery's fork of multiprocessing; unlike the standard
+    # library it lets a daemonic prefork child start a pool of its own.
+    pool = Pool(processes=min(IMAGE_NORMALIZE_MAX_WORKERS, len(images)))
+    try:
+        return pool.map(_normalize_or_keep, images)
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,99 @@
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from uuid import UUID
+from config import settings
+import base64
+
+DEFAULT_PAGE_SIZE = settings.DEFAULT_PAGE_SIZE
+MAX_PAGE_SIZE = settings.MAX_PAGE_SIZE
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def parse_fields(fields: str | None, model, response_model) -> list[str] | None:
+    # Only plain columns that the response model exposes can be projected;
+    # nested relationships are never loaded for a projected listing.
+    if fields is None:
+        return None
+
+    allowed = set(response_model.model_fields) & set(model.__table__.columns.keys())
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"fields": f"Unknown fields. Allowed: {', '.join(sorted(allowed))}"},
+        )
+
+    return requested
+
+
+async def fetch_page(
+    db: AsyncSession,
+    model,
+    conditions: list,
+    cursor: str | None,
+    limit: int,
+    fields: list[str] | None = None,
+    options: list | None = None,
+):
+    # Keyset pagination on (created_at, id): with the (parent, created_at, id)
+    # indexes in models.py each page is an index range scan regardless of how
+    # deep the client has paged.
+    if fields is not None:
+        keys = list(dict.fromkeys([*fields, "created_at", "id"]))
+        query = select(*[getattr(model, key) for key in keys])
+    else:
+        query = select(model).options(*(options or []))
+
+    query = query.where(*conditions)
+
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) > tuple_(created_at, id))
+
+    query = query.order_by(model.created_at.asc(), model.id.asc()).limit(limit + 1)
+
+    if fields is not None:
+        rows = (await db.execute(query)).all()
+    else:
+        rows = (await db.scalars(query)).all()
+
+    items = rows[:limit]
+    next_cursor = (
+        encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > limit else None
+    )
+
+    if fields is not None:
+        items = [{field: row._mapping[field] for field in fields} for row in items]
+
+    return items, next_cursor
+
+
+def page_response(response: Response, items, next_cursor: str | None, projected: bool):
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    if projected:
+        return JSONResponse(jsonable_encoder(items), headers=headers)
+
+    response.headers.update(headers)
+    return items
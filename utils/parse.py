@@ -1,61 +1,239 @@
 from llama_cloud_services import LlamaParse
 from config import settings
-from utils.s3 import read_file_from_s3
+from utils.images import NORMALIZE_OPTIONS, normalize_images
+from utils.s3 import (
+    read_file_from_s3,
+    read_file_from_s3_if_exists,
+    read_files_from_s3,
+    write_file_to_s3,
+    write_files_to_s3,
+)
 from collections import defaultdict
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
 
 LLAMA_PARSE_API_KEY = settings.LLAMA_PARSE_API_KEY
+PARSE_CACHE_PREFIX = "parse-cache"
+IMAGE_MAX_BYTES_PER_DOCUMENT = settings.IMAGE_MAX_BYTES_PER_DOCUMENT
 
+logger = logging.getLogger(__name__)
 
-def chunk_document(document):
-    file_name = document.filename
-    file_content = read_file_from_s3(document.s3_key)
-
-    parser_no_llm = LlamaParse(
-        api_key=LLAMA_PARSE_API_KEY,
-        parse_mode="parse_page_without_llm",
-    )
-
-    result = parser_no_llm.parse(file_content, extra_info={"file_name": file_name})
+NO_LLM_PARSE_OPTIONS = {
+    "parse_mode": "parse_page_without_llm",
+}
 
-    parser_lvm = LlamaParse(
-        api_key=LLAMA_PARSE_API_KEY,
-        parse_mode="parse_page_with_lvm",
-        result_type="markdown",
-        hide_headers=True,
-        hide_footers=True,
-        user_prompt=""" For every object image in the page (not screenshots), insert a placeholder using the exact filename.
+LVM_PARSE_OPTIONS = {
+    "parse_mode": "parse_page_with_lvm",
+    "result_type": "markdown",
+    "hide_headers": True,
+    "hide_footers": True,
+    "user_prompt": """ For every object image in the page (not screenshots), insert a placeholder using the exact filename.
                         The filenames follow the format img_p{page_number}_{image_number}.png, e.g., img_p0_1.png for the first image on page 0.
                         Do not insert placeholders for screenshots. Keep all other content as normal markdown.""",
+}
+
+PARSE_OPTIONS_HASH = hashlib.sha256(
+    json.dumps(
+        {
+            "no_llm": NO_LLM_PARSE_OPTIONS,
+            "lvm": LVM_PARSE_OPTIONS,
+            "normalize": NORMALIZE_OPTIONS,
+        },
+        sort_keys=True,
+    ).encode()
+).hexdigest()[:16]
+
+
+async def _parse_concurrently(file_content: bytes, file_name: str):
+    parser_no_llm = LlamaParse(api_key=LLAMA_PARSE_API_KEY, **NO_LLM_PARSE_OPTIONS)
+    parser_lvm = LlamaParse(api_key=LLAMA_PARSE_API_KEY, **LVM_PARSE_OPTIONS)
+
+    extra_info = {"file_name": file_name}
+
+    return await asyncio.gather(
+        parser_no_llm.aparse(file_content, extra_info=extra_info),
+        parser_lvm.aparse(file_content, extra_info=extra_info),
     )
 
-    result_lvm = parser_lvm.parse(file_content, extra_info={"file_name": file_name})
+
+class ImageBudget:
+    # Caps the image bytes a single document keeps in memory and uploads.
+    # Images past the cap are dropped from their chunks and counted instead.
+    # It does not bound the temporary download directory, which LlamaParse
+    # fills with every image before any of them can be measured.
+    def __init__(self, max_bytes: int = IMAGE_MAX_BYTES_PER_DOCUMENT):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.skipped = 0
+
+    def admit(self, size: int) -> bool:
+        if self.used_bytes + size > self.max_bytes:
+            self.skipped += 1
+            return False
+
+        self.used_bytes += size
+        return True
+
+    def usage(self) -> dict:
+        return {"image_bytes": self.used_bytes, "images_skipped": self.skipped}
+
+
+def _parse_and_cache(
+    file_content: bytes, file_name: str, cache_prefix: str, budget: ImageBudget
+):
+    result, result_lvm = asyncio.run(_parse_concurrently(file_content, file_name))
 
     text_nodes = result_lvm.get_markdown_nodes(split_by_page=True)
-    image_nodes = result.get_image_nodes(
-        include_object_images=True,
-        include_screenshot_images=False,
-        image_download_dir=f"./images/{document.id}/",
-    )
+
+    # LlamaParse only downloads images to a directory, so they pass through a
+    # temporary one that is removed as soon as the bytes are read back. Disk
+    # use is transient but not capped; the budget applies once it is read.
+    images = []
+    with tempfile.TemporaryDirectory(prefix="parse-images-") as image_dir:
+        image_nodes = result.get_image_nodes(
+            include_object_images=True,
+            include_screenshot_images=False,
+            image_download_dir=image_dir,
+        )
+
+        for img in image_nodes:
+            size = os.path.getsize(img.image_path)
+            if not budget.admit(size):
+                continue
+
+            with open(img.image_path, "rb") as img_file:
+                images.append(
+                    {
+                        "page_number": img.metadata.get("page_number"),
+                        "filename": os.path.basename(img.image_path),
+                        "content": img_file.read(),
+                        "original_size": size,
+                    }
+                )
+
+    # Images are normalized here rather than per document, so the cache and
+    # every document built from it hold only the downscaled copies.
+    normalized = normalize_images([(img["content"], img["filename"]) for img in images])
+    for image, (content, filename) in zip(images, normalized):
+        image["content"] = content
+        image["filename"] = filename
+
+    parsed = {
+        "pages": [
+            {"page_number": node.metadata.get("page_number"), "text": node.text}
+            for node in text_nodes
+        ],
+        "images": images,
+    }
+
+    try:
+        manifest = {
+            "pages": parsed["pages"],
+            "images": [
+                {
+                    "page_number": image["page_number"],
+                    "filename": image["filename"],
+                    "s3_key": f"{cache_prefix}/images/{image['filename']}",
+                    "original_size": image["original_size"],
+                }
+                for image in parsed["images"]
+            ],
+        }
+
+        write_files_to_s3(
+            [
+                (entry["s3_key"], image["content"], "application/octet-stream")
+                for entry, image in zip(manifest["images"], parsed["images"])
+            ]
+        )
+
+        # Images dropped by the budget are left out of the manifest, so the
+        # result is only cached when it is complete.
+        if not budget.skipped:
+            write_file_to_s3(
+                f"{cache_prefix}/result.json",
+                json.dumps(manifest).encode(),
+                "application/json",
+            )
+    except Exception as e:
+        logger.warning(f"Failed to cache parse result under {cache_prefix}: {str(e)}")
+
+    return parsed
+
+
+def _load_cached_parse(manifest_bytes: bytes, budget: ImageBudget):
+    manifest = json.loads(manifest_bytes)
+
+    admitted = [
+        image for image in manifest["images"] if budget.admit(image["original_size"])
+    ]
+    contents = read_files_from_s3([image["s3_key"] for image in admitted])
+
+    images = [
+        {
+            "page_number": image["page_number"],
+            "filename": image["filename"],
+            "content": content,
+            "original_size": image["original_size"],
+        }
+        for image, content in zip(admitted, contents)
+    ]
+
+    return {"pages": manifest["pages"], "images": images}
+
+
+def chunk_document(document):
+    file_name = document.filename
+    file_content = read_file_from_s3(document.s3_key)
+    budget = ImageBudget()
+
+    # Parse output depends only on the file bytes and the parser options, so a
+    # retried or re-run document reuses it instead of calling LlamaParse again.
+    content_hash = hashlib.sha256(file_content).hexdigest()
+    cache_prefix = f"{PARSE_CACHE_PREFIX}/{content_hash}/{PARSE_OPTIONS_HASH}"
+
+    cached_manifest = read_file_from_s3_if_exists(f"{cache_prefix}/result.json")
+
+    if cached_manifest is not None:
+        parsed = _load_cached_parse(cached_manifest, budget)
+    else:
+        parsed = _parse_and_cache(file_content, file_name, cache_prefix, budget)
+
+    if budget.skipped:
+        logger.warning(
+            f"Document {document.id} exceeded the image budget of "
+            f"{budget.max_bytes} bytes, skipped {budget.skipped} images"
+        )
+    logger.info(f"Document {document.id} holds {budget.used_bytes} bytes of images")
 
     images_by_page = defaultdict(list)
 
-    for img in image_nodes:
-        page = img.metadata.get("page_number")
-        images_by_page[page].append(img.image_path)
+    for img in parsed["images"]:
+        images_by_page[img["page_number"]].append(
+            {
+                "filename": img["filename"],
+                "content": img["content"],
+                "original_size": img["original_size"],
+            }
+        )
 
     chunks = []
 
-    for text_node in text_nodes:
-        page = text_node.metadata.get("page_number")
-        page_images = images_by_page.get(page, [])
+    for page in parsed["pages"]:
+        page_number = page["page_number"]
+        page_images = images_by_page.get(page_number, [])
 
         chunks.append(
             {
-                "page_number": page,
-                "content": text_node.text,
+                "page_number": page_number,
+                "content": page["text"],
                 "images": page_images,
                 "type": "text" if len(page_images) == 0 else "text,image",
             }
         )
 
-    return chunks
+    return chunks, budget.usage()
@@ -0,0 +1,9 @@
+import redis
+import redis.asyncio
+from config import settings
+
+redis_client = redis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+
+async_redis_client = redis.asyncio.Redis.from_url(
+    settings.CELERY_BROKER_URL, decode_responses=True
+)
@@ -0,0 +1,192 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from config import settings
+from db import AsyncSessionLocal
+from models import Chunk, Document
+from utils import gpu
+import asyncio
+import time
+
+SEARCH_TEXT_SEARCH_CONFIG = settings.SEARCH_TEXT_SEARCH_CONFIG
+SEARCH_RRF_K = settings.SEARCH_RRF_K
+SEARCH_HYBRID_CANDIDATE_MULTIPLIER = settings.SEARCH_HYBRID_CANDIDATE_MULTIPLIER
+
+
+async def embed_query(query: str) -> list[float]:
+    # Queries are interactive, so they skip the limiter that paces ingestion.
+    embeddings = await run_in_threadpool(gpu.embed, [query], throttle=False)
+    return embeddings[0]
+
+
+async def vector_search(
+    db: AsyncSession,
+    project_id: UUID,
+    query_vector: list[float],
+    top_k: int,
+    ef_search: int,
+    document_ids: list[UUID] | None = None,
+):
+    # Both settings are transaction-local. Iterative scans keep the HNSW index
+    # returning candidates until top_k rows survive the project filter.
+    await db.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+    await db.execute(
+        select(func.set_config("hnsw.iterative_scan", "relaxed_order", True))
+    )
+
+    distance = Chunk.embedding.cosine_distance(query_vector)
+
+    query = (
+        select(
+            Chunk.id,
+            Chunk.document_id,
+            Chunk.page_number,
+            Chunk.content,
+            Chunk.summarised_content,
+            distance.label("distance"),
+        )
+        .join(Document, Document.id == Chunk.document_id)
+        .where(Document.project_id == project_id, Chunk.embedding.is_not(None))
+        .order_by(distance)
+        .limit(top_k)
+    )
+
+    if document_ids:
+        query = query.where(Chunk.document_id.in_(document_ids))
+
+    # relaxed_order may return the index's candidates slightly out of order,
+    # so they are materialized and re-sorted by exact distance, as the
+    # pgvector docs recommend.
+    candidates = query.cte("candidates").prefix_with("MATERIALIZED")
+    query = select(candidates).order_by(candidates.c.distance)
+
+    rows = (await db.execute(query)).all()
+
+    return [
+        {
+            "chunk_id": row.id,
+            "document_id": row.document_id,
+            "page_number": row.page_number,
+            "content": row.content,
+            "summarised_content": row.summarised_content,
+            "score": 1 - row.distance,
+        }
+        for row in rows
+    ]
+
+
+async def lexical_search(
+    db: AsyncSession,
+    project_id: UUID,
+    query_text: str,
+    top_k: int,
+    document_ids: list[UUID] | None = None,
+):
+    ts_query = func.websearch_to_tsquery(SEARCH_TEXT_SEARCH_CONFIG, query_text)
+    rank = func.ts_rank_cd(Chunk.content_tsv, ts_query)
+
+    query = (
+        select(
+            Chunk.id,
+            Chunk.document_id,
+            Chunk.page_number,
+            Chunk.content,
+            Chunk.summarised_content,
+            rank.label("rank"),
+        )
+        .join(Document, Document.id == Chunk.document_id)
+        .where(Document.project_id == project_id, Chunk.content_tsv.op("@@")(ts_query))
+        .order_by(rank.desc())
+        .limit(top_k)
+    )
+
+    if document_ids:
+        query = query.where(Chunk.document_id.in_(document_ids))
+
+    rows = (await db.execute(query)).all()
+
+    return [
+        {
+            "chunk_id": row.id,
+            "document_id": row.document_id,
+            "page_number": row.page_number,
+            "content": row.content,
+            "summarised_content": row.summarised_content,
+            "score": row.rank,
+        }
+        for row in rows
+    ]
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], top_k: int):
+    fused = {}
+
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.setdefault(result["chunk_id"], {**result, "score": 0.0})
+            entry["score"] += 1 / (SEARCH_RRF_K + rank)
+
+    return sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:top_k]
+
+
+async def _vector_leg(project_id, query_text, top_k, ef_search, document_ids):
+    started = time.perf_counter()
+    query_vector = await embed_query(query_text)
+    embedded = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        results = await vector_search(
+            db, project_id, query_vector, top_k, ef_search, document_ids
+        )
+
+    searched = time.perf_counter()
+    return results, (embedded - started) * 1000, (searched - embedded) * 1000
+
+
+async def _lexical_leg(project_id, query_text, top_k, document_ids):
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        results = await lexical_search(db, project_id, query_text, top_k, document_ids)
+
+    return results, (time.perf_counter() - started) * 1000
+
+
+async def search_project_chunks(
+    project_id: UUID,
+    query_text: str,
+    top_k: int,
+    ef_search: int,
+    document_ids: list[UUID] | None = None,
+    mode: str = "vector",
+):
+    # The two hybrid legs run on separate sessions at the same time, so the
+    # request costs max(lexical, embed + vector) rather than their sum.
+    started = time.perf_counter()
+    timings = {"lexical_ms": None}
+
+    if mode == "hybrid":
+        candidates = top_k * SEARCH_HYBRID_CANDIDATE_MULTIPLIER
+
+        (vector_results, embed_ms, search_ms), (lexical_results, lexical_ms) = (
+            await asyncio.gather(
+                _vector_leg(
+                    project_id, query_text, candidates, ef_search, document_ids
+                ),
+                _lexical_leg(project_id, query_text, candidates, document_ids),
+            )
+        )
+
+        results = reciprocal_rank_fusion([vector_results, lexical_results], top_k)
+        timings["lexical_ms"] = round(lexical_ms, 2)
+    else:
+        results, embed_ms, search_ms = await _vector_leg(
+            project_id, query_text, top_k, ef_search, document_ids
+        )
+
+    timings["embed_ms"] = round(embed_ms, 2)
+    timings["search_ms"] = round(search_ms, 2)
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    return results, timings
@@ -1,15 +1,24 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from config import settings
 import os
 from datetime import datetime
 import uuid
+import hashlib
+import asyncio
 from typing import List
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from uuid import UUID
+from concurrent.futures import ThreadPoolExecutor
 
 S3_BUCKET = settings.S3_BUCKET_NAME
 AWS_REGION = settings.AWS_REGION
+IMAGE_UPLOAD_MAX_IN_FLIGHT = settings.IMAGE_UPLOAD_MAX_IN_FLIGHT
+DOCUMENT_UPLOAD_MAX_IN_FLIGHT = settings.DOCUMENT_UPLOAD_MAX_IN_FLIGHT
+S3_UPLOAD_PART_SIZE = settings.S3_UPLOAD_PART_SIZE
+UPLOAD_READ_SIZE = 1024 * 1024
 
 s3_client = boto3.client(
     "s3",
@@ -18,82 +27,162 @@ s3_client = boto3.client(
     aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
 )
 
+document_transfer_config = TransferConfig(
+    multipart_threshold=S3_UPLOAD_PART_SIZE,
+    multipart_chunksize=S3_UPLOAD_PART_SIZE,
+    max_concurrency=4,
+)
+
 
 def read_file_from_s3(s3_key: str) -> bytes:
     response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
     return response["Body"].read()
 
 
-async def upload_files_to_s3(user_id: UUID, project_id: UUID, files: List[UploadFile]):
+def read_file_from_s3_if_exists(s3_key: str) -> bytes | None:
+    try:
+        return read_file_from_s3(s3_key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return None
+        raise
+
+
+def s3_object_exists(s3_key: str) -> bool:
+    try:
+        s3_client.head_object(Bucket=S3_BUCKET, Key=s3_key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return False
+        raise
+
+
+def write_file_to_s3(s3_key: str, body: bytes, content_type: str):
+    s3_client.put_object(
+        Bucket=S3_BUCKET,
+        Key=s3_key,
+        Body=body,
+        ContentType=content_type,
+    )
+
+
+def write_files_to_s3(
+    files: List[tuple[str, bytes, str]],
+    max_in_flight: int = IMAGE_UPLOAD_MAX_IN_FLIGHT,
+):
+    # Each entry holds the arguments for write_file_to_s3; the first failure
+    # is raised once every write has finished.
+    if not files:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(files))) as executor:
+        list(executor.map(lambda file: write_file_to_s3(*file), files))
+
+
+def read_files_from_s3(
+    s3_keys: List[str],
+    max_in_flight: int = IMAGE_UPLOAD_MAX_IN_FLIGHT,
+) -> List[bytes]:
+    if not s3_keys:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(s3_keys))) as executor:
+        return list(executor.map(read_file_from_s3, s3_keys))
+
+
+def _hash_file(fileobj):
+    hasher = hashlib.sha256()
+    file_size = 0
+    while chunk := fileobj.read(UPLOAD_READ_SIZE):
+        hasher.update(chunk)
+        file_size += len(chunk)
+    fileobj.seek(0)
+
+    return hasher.hexdigest(), file_size
+
+
+def _store_document(fileobj, s3_key: str, filename: str, content_type: str):
+    if s3_object_exists(s3_key):
+        return
+
+    # upload_fileobj streams the file to S3 as a multipart upload in
+    # S3_UPLOAD_PART_SIZE parts, so only a few parts are ever held in memory.
+    s3_client.upload_fileobj(
+        fileobj,
+        S3_BUCKET,
+        s3_key,
+        ExtraArgs={
+            "ContentType": content_type,
+            "Metadata": {
+                "original_filename": filename,
+                "uploaded_at": datetime.now().isoformat(),
+            },
+        },
+        Config=document_transfer_config,
+    )
+
+
+async def _upload_file(file: UploadFile, semaphore: asyncio.Semaphore):
     allowed_extensions = {".pdf", ".txt", ".md", ".doc", ".docx"}
 
-    results = []
-    total_size = 0
-
-    for file in files:
-        file_ext = os.path.splitext(file.filename)[1].lower()  # type: ignore
-        if file_ext not in allowed_extensions:
-            results.append(
-                {
-                    "filename": file.filename,
-                    "status": "error",
-                    "error": f"File type {file_ext} not allowed",
-                }
-            )
-            continue
-        unique_id = str(uuid.uuid4())[:8]
-        original_name = os.path.splitext(file.filename)[0]  # type: ignore
-        s3_key = f"uploads/{user_id}/{project_id}/documents/{unique_id}_{original_name}{file_ext}"
+    file_ext = os.path.splitext(file.filename)[1].lower()  # type: ignore
+    if file_ext not in allowed_extensions:
+        return {
+            "filename": file.filename,
+            "status": "error",
+            "error": f"File type {file_ext} not allowed",
+        }
 
+    async with semaphore:
         try:
-            file_content = await file.read()
-            file_size = len(file_content)
-
-            # Upload to S3
-            s3_client.put_object(
-                Bucket=S3_BUCKET,
-                Key=s3_key,
-                Body=file_content,
-                ContentType=file.content_type or "application/octet-stream",
-                Metadata={
-                    "original_filename": file.filename,
-                    "uploaded_at": datetime.now().isoformat(),
-                },
+            # Documents are stored by content hash, so identical uploads share
+            # one object and can be matched to already-processed documents.
+            content_hash, file_size = await run_in_threadpool(_hash_file, file.file)
+            s3_key = f"uploads/content/{content_hash}{file_ext}"
+
+            await run_in_threadpool(
+                _store_document,
+                file.file,
+                s3_key,
+                file.filename,
+                file.content_type or "application/octet-stream",
             )
 
             file_url = f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
 
-            results.append(
-                {
-                    "filename": file.filename,
-                    "status": "uploaded",
-                    "s3_key": s3_key,
-                    "file_url": file_url,
-                    "size": file_size,
-                }
-            )
-
-            total_size += file_size
+            return {
+                "filename": file.filename,
+                "status": "uploaded",
+                "s3_key": s3_key,
+                "content_hash": content_hash,
+                "file_url": file_url,
+                "size": file_size,
+            }
 
         except ClientError as e:
-            results.append(
-                {
-                    "filename": file.filename,
-                    "status": "failed",
-                    "error": f"S3 upload failed: {str(e)}",
-                }
-            )
+            return {
+                "filename": file.filename,
+                "status": "failed",
+                "error": f"S3 upload failed: {str(e)}",
+            }
         except Exception as e:
-            results.append(
-                {
-                    "filename": file.filename,
-                    "status": "failed",
-                    "error": f"Upload failed: {str(e)}",
-                }
-            )
+            return {
+                "filename": file.filename,
+                "status": "failed",
+                "error": f"Upload failed: {str(e)}",
+            }
+
+
+async def upload_files_to_s3(files: List[UploadFile]):
+    # Request files are already spooled to disk by the multipart parser; they
+    # are hashed and streamed to S3 off the event loop, a few at a time.
+    semaphore = asyncio.Semaphore(DOCUMENT_UPLOAD_MAX_IN_FLIGHT)
+    results = await asyncio.gather(*[_upload_file(file, semaphore) for file in files])
 
     successful = sum(1 for r in results if r["status"] == "uploaded")
     failed = len(results) - successful
+    total_size = sum(r["size"] for r in results if r["status"] == "uploaded")
 
     return {
         "results": results,
@@ -104,7 +193,8 @@ async def upload_files_to_s3(user_id: UUID, project_id: UUID, files: List[Upload
 
 
 def upload_image_to_s3(
-    image_path: str,
+    image_content: bytes,
+    image_filename: str,
     user_id: UUID,
     project_id: UUID,
     document_id: UUID,
@@ -112,12 +202,6 @@ def upload_image_to_s3(
     page_number: int = 0,
 ):
     try:
-        # Read the local image file
-        with open(image_path, "rb") as img_file:
-            image_content = img_file.read()
-
-        # Extract filename from path
-        image_filename = os.path.basename(image_path)
         file_ext = os.path.splitext(image_filename)[1].lower()
 
         # Generate S3 key
@@ -151,12 +235,6 @@ def upload_image_to_s3(
             },
         )
 
-        # # Optional: Clean up local file after successful upload
-        # try:
-        #     os.remove(image_path)
-        # except Exception:
-        #     pass
-
         return {
             "status": "uploaded",
             "s3_key": s3_key,
@@ -164,26 +242,33 @@ def upload_image_to_s3(
             "size": len(image_content),
         }
 
-    except FileNotFoundError:
-        return {
-            "status": "failed",
-            "filename": os.path.basename(image_path),
-            "error": f"File not found: {image_path}",
-        }
     except ClientError as e:
         return {
             "status": "failed",
-            "filename": os.path.basename(image_path),
+            "filename": image_filename,
             "error": f"S3 upload failed: {str(e)}",
         }
     except Exception as e:
         return {
             "status": "failed",
-            "filename": os.path.basename(image_path),
+            "filename": image_filename,
             "error": f"Upload failed: {str(e)}",
         }
 
 
+def upload_images_to_s3(
+    uploads: List[dict],
+    max_in_flight: int = IMAGE_UPLOAD_MAX_IN_FLIGHT,
+):
+    # Each entry holds the keyword arguments for upload_image_to_s3. Results
+    # come back in the same order, one per image, failures included.
+    if not uploads:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(uploads))) as executor:
+        return list(executor.map(lambda upload: upload_image_to_s3(**upload), uploads))
+
+
 async def delete_file_from_s3(s3_key: str):
     if not s3_key:
         return